@@ -1,112 +1,259 @@
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, Response, g, request, jsonify, make_response, stream_with_context
 from flask_cors import CORS
 import gensim.downloader as api
-from typing import List, Tuple, Dict
-from itertools import combinations
+import json
+import os
+import time
+from typing import Iterator, List, Tuple, Dict, Optional
 import nltk
-from nltk.corpus import stopwords, wordnet
-from nltk import pos_tag
-
-nltk.download('averaged_perceptron_tagger_eng')
+import numpy as np
+from nltk.corpus import stopwords
+from scoring import search_similarities, id_similarity_matrix, vocab_ids, SearchStats, DEFAULT_TOP_K, DEFAULT_MAX_CLUE_SIZE
+from embeddings import load_vectors
+from assets import load_offline_assets
+from neighbors import EligibleVocabulary, NeighborIndex, scan_most_similar
+from pool import PoolCache
+from lexicon import BoardFilter, ProperNounFilter, SynonymTable, wordnet_synonyms
+from cache import LRUCache, artifact_fingerprint, canonical_hash, open_shared_cache
+from sessions import GameSession
+from protocol import parse_hint_request, hints_body
+from metrics import Registry, CONTENT_TYPE
+from profiler import SamplingProfiler, is_authorized, DEFAULT_INTERVAL
 
 app = Flask(__name__)
 
 CORS(app, resources={r"/generate-hints": {
     "origins": ["http://localhost:3000", "https://codecracker-seven.vercel.app"]
+}, r"/games/*": {
+    "origins": ["http://localhost:3000", "https://codecracker-seven.vercel.app"]
 }})
 
-print("Loading word vectors...")
-word_vectors = api.load('glove-twitter-25')
-print("Word vectors loaded.")
+# Set CODECRACKER_ASSETS to a bundle written by `python manage.py prepare-assets` to boot without network access
+ASSETS_DIR = os.environ.get('CODECRACKER_ASSETS')
+# Set CODECRACKER_NEIGHBORS to an index written by `python manage.py build-neighbors` so requests never scan the vocabulary
+NEIGHBORS_PATH = os.environ.get('CODECRACKER_NEIGHBORS')
+# Set CODECRACKER_POOL_CACHE to candidates written by `python manage.py build-pool-cache` for the frontend's WORD_POOL
+POOL_CACHE_PATH = os.environ.get('CODECRACKER_POOL_CACHE')
+# Set CODECRACKER_POS_TABLE to a table written by `python manage.py build-pos-table` so no tagger runs per request
+POS_TABLE_PATH = os.environ.get('CODECRACKER_POS_TABLE')
+# Set CODECRACKER_SYNONYMS to a table written by `python manage.py compile-wordnet` to expand synonyms without NLTK
+SYNONYMS_PATH = os.environ.get('CODECRACKER_SYNONYMS')
+# Set CODECRACKER_ELIGIBLE to a mask written by `python manage.py build-eligible` so neighbor search only scans words that can be hints
+ELIGIBLE_PATH = os.environ.get('CODECRACKER_ELIGIBLE')
+# Set CODECRACKER_RESTRICT_VOCAB to draw hints only from the N most frequent words; vocabularies are frequency ordered
+RESTRICT_VOCAB = int(os.environ.get('CODECRACKER_RESTRICT_VOCAB', 0)) or None
+# Set CODECRACKER_SHARED_CACHE to a redis:// URL, or to "local" for a host-local store, to share cached work across workers
+SHARED_CACHE_URL = os.environ.get('CODECRACKER_SHARED_CACHE')
+SHARED_CACHE_TTL = int(os.environ.get('CODECRACKER_SHARED_CACHE_TTL', 86400))
+# Whole /generate-hints responses kept per worker, keyed by the canonical board, and how long each stays fresh
+RESPONSE_CACHE_SIZE = int(os.environ.get('CODECRACKER_RESPONSE_CACHE_SIZE', 1024))
+RESPONSE_CACHE_TTL = float(os.environ.get('CODECRACKER_RESPONSE_CACHE_TTL', 600))
+# Games kept for incremental rescoring, and how many seconds an idle game is kept
+GAME_SESSION_LIMIT = int(os.environ.get('CODECRACKER_GAME_SESSIONS', 1000))
+GAME_SESSION_TTL = float(os.environ.get('CODECRACKER_GAME_SESSION_TTL', 3600))
+# Most boards accepted by one /generate-hints/batch request, and how many of them share one similarity matrix
+BATCH_LIMIT = int(os.environ.get('CODECRACKER_BATCH_LIMIT', 10000))
+BATCH_GROUP = int(os.environ.get('CODECRACKER_BATCH_GROUP', 32))
+# Comma-separated keys that may profile a request with the X-Codecracker-Profile header or ?profile= query flag
+PROFILE_KEYS = [key.strip() for key in os.environ.get('CODECRACKER_PROFILE_KEYS', '').split(',') if key.strip()]
+PROFILE_INTERVAL = float(os.environ.get('CODECRACKER_PROFILE_INTERVAL', DEFAULT_INTERVAL))
+# Set CODECRACKER_VECTORS to a store written by `python manage.py convert-vectors` to share one mmap'd copy across workers
+VECTORS_PATH = os.environ.get('CODECRACKER_VECTORS')
+
+if ASSETS_DIR:
+    assets = load_offline_assets(ASSETS_DIR, verify=os.environ.get('CODECRACKER_VERIFY_ASSETS', '1') != '0')
+    word_vectors = assets.word_vectors
+    stop_words = assets.stop_words
+    neighbor_index = assets.neighbor_index
+    proper_nouns = assets.proper_nouns
+    synonym_table = assets.synonym_table
+    eligible_vocabulary = assets.eligible_vocabulary
+else:
+    nltk.download('averaged_perceptron_tagger_eng')
+
+    print("Loading word vectors...")
+    word_vectors = load_vectors(VECTORS_PATH) if VECTORS_PATH else api.load('glove-twitter-25')
+    print("Word vectors loaded.")
+
+    nltk.download('stopwords')
+    nltk.download('wordnet')
+    nltk.download('averaged_perceptron_tagger')
+    stop_words = set(stopwords.words('english'))
+    neighbor_index = None
+    proper_nouns = ProperNounFilter(word_vectors)
+    synonym_table = None
+    eligible_vocabulary = None
+
+if NEIGHBORS_PATH:
+    neighbor_index = NeighborIndex.load(NEIGHBORS_PATH, word_vectors)
+
+if POS_TABLE_PATH:
+    proper_nouns = ProperNounFilter.load(POS_TABLE_PATH, word_vectors)
+
+if SYNONYMS_PATH:
+    synonym_table = SynonymTable.load(SYNONYMS_PATH, word_vectors)
+
+if ELIGIBLE_PATH:
+    eligible_vocabulary = EligibleVocabulary.load(ELIGIBLE_PATH, word_vectors)
+
+pool_cache = None
+if POOL_CACHE_PATH:
+    pool_cache = PoolCache.load(POOL_CACHE_PATH, word_vectors, RESTRICT_VOCAB, len(eligible_vocabulary) if eligible_vocabulary is not None else None)
+    if not pool_cache.matches:
+        print(f"{POOL_CACHE_PATH} was built with a different CODECRACKER_RESTRICT_VOCAB or eligible vocabulary; it will not be used")
+
+if RESTRICT_VOCAB and neighbor_index is not None:
+    # The index keeps its own top-N lists, so results past the limit are only dropped afterwards
+    print("CODECRACKER_RESTRICT_VOCAB only filters neighbor index results; build it with --eligible from `build-eligible --top N` to search within the limit")
 
-nltk.download('stopwords')
-nltk.download('wordnet')
-nltk.download('averaged_perceptron_tagger')
-stop_words = set(stopwords.words('english'))
+# Keeps cached work and ETags from different vector stores apart
+CACHE_NAMESPACE = f"codecracker:{len(word_vectors)}x{word_vectors.vector_size}"
+if word_vectors.vectors.dtype != np.float32:
+    CACHE_NAMESPACE += f":{word_vectors.vectors.dtype}"
+if RESTRICT_VOCAB:
+    CACHE_NAMESPACE += f":top{RESTRICT_VOCAB}"
+if eligible_vocabulary is not None:
+    # Neighbors drawn from the eligible words alone differ from a full scan's
+    CACHE_NAMESPACE += f":eligible{len(eligible_vocabulary)}"
+# Rebuilding any loaded artifact changes hints without changing the vocabulary, so each one is part of the namespace too
+artifacts = {'assets': canonical_hash(assets.manifest)} if ASSETS_DIR else {}
+for name, path in [('vectors', VECTORS_PATH), ('neighbors', NEIGHBORS_PATH), ('pos', POS_TABLE_PATH), ('synonyms', SYNONYMS_PATH), ('eligible', ELIGIBLE_PATH), ('pool', POOL_CACHE_PATH)]:
+    if path:
+        artifacts[name] = artifact_fingerprint(path)
+if artifacts:
+    CACHE_NAMESPACE += f":{canonical_hash(artifacts)[:12]}"
 
-similarity_cache = {}
+response_cache = LRUCache(RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+game_sessions = LRUCache(GAME_SESSION_LIMIT, ttl=GAME_SESSION_TTL, idle=True)
+# Second-level cache shared by every worker
+shared_cache = open_shared_cache(SHARED_CACHE_URL, CACHE_NAMESPACE, SHARED_CACHE_TTL)
 
-def get_similarity(word1: str, word2: str) -> float:
-    pair = tuple(sorted([word1, word2]))
-    if pair in similarity_cache:
-        return similarity_cache[pair]
+# Per-process metrics, served on /metrics
+registry = Registry()
+stage_seconds = registry.histogram('codecracker_stage_seconds', "Time spent in each stage of hint generation", ['stage'])
+request_seconds = registry.histogram('codecracker_request_seconds', "Request latency by endpoint and status", ['endpoint', 'status'])
+candidates_total = registry.counter('codecracker_candidates_total', "Valid hints scored, summed over boards")
+combinations_total = registry.counter('codecracker_combinations_total', "Hint and word combinations by what the search did with them", ['outcome'])
+in_process_caches = {'response': response_cache, 'game_sessions': game_sessions, 'proper_nouns': proper_nouns.tagged}
 
-    if word1 in word_vectors and word2 in word_vectors:
-        similarity = word_vectors.similarity(word1, word2)
-    else:
-        similarity = 0.0
+def cache_stat(field: str):
+    return lambda: {(name,): cache.stats()[field] for name, cache in in_process_caches.items()}
 
-    similarity_cache[pair] = similarity
-    return similarity
+registry.callback('codecracker_cache_hit_ratio', "Hits over lookups for each in-process cache", 'gauge', cache_stat('hit_ratio'), ['cache'])
+registry.callback('codecracker_cache_entries', "Entries held by each in-process cache", 'gauge', cache_stat('size'), ['cache'])
+registry.callback('codecracker_cache_hits_total', "Lookups answered by each in-process cache", 'counter', cache_stat('hits'), ['cache'])
+registry.callback('codecracker_cache_misses_total', "Lookups each in-process cache could not answer", 'counter', cache_stat('misses'), ['cache'])
+registry.callback('codecracker_cache_evictions_total', "Entries each in-process cache dropped to stay within its size", 'counter', cache_stat('evictions'), ['cache'])
+
+def record_search(hint_count: int, stats: SearchStats) -> None:
+    candidates_total.inc(hint_count)
+    combinations_total.inc(stats.combinations, outcome='considered')
+    combinations_total.inc(stats.evaluated, outcome='evaluated')
+    combinations_total.inc(stats.pruned, outcome='pruned')
 
 def get_synonyms(word: str) -> List[str]:
-    synonyms = set()
-    for synset in wordnet.synsets(word):
-        for lemma in synset.lemmas():
-            if lemma.name().isalpha():  # Only include valid words
-                synonyms.add(lemma.name())
-    return list(synonyms)
-
-def is_valid_hint(hint: str, board_words: set) -> bool:
-    hint_lower = hint.lower()
-    
-    if hint_lower in stop_words:
-        return False
-    
-    for word in board_words:
-        word_lower = word.lower()
-        if word_lower in hint_lower or hint_lower in word_lower:
-            return False
-    
-    return True
-
-def is_ambiguous_hint(hint: str) -> bool:
-    pos = pos_tag([hint])[0][1]
-    return pos in ['NNP', 'NNPS']  # Filtering out proper nouns
-
-def calculate_weighted_coherence(hint: str, words: List[str], weight_factor: float = 0.7) -> float:
-    similarities = [get_similarity(hint, word) for word in words]
-    return sum(similarities) / (len(similarities) ** weight_factor) if similarities else 0
-
-def adaptive_threshold(num_words: int) -> float:
-    base_threshold = 0.4
-    return base_threshold - (num_words * 0.05)
-
-def get_valid_hints(words: List[str], all_board_words: set, top_n: int = 100) -> List[str]:
-    hints = set()
+    if synonym_table is not None and synonym_table.covers(word):
+        return synonym_table.synonyms(word)
+    return wordnet_synonyms(word)
+
+def scan_neighbors(word: str, top_n: int) -> List[Tuple[str, float]]:
+    if eligible_vocabulary is not None:
+        return eligible_vocabulary.most_similar(word, topn=top_n, restrict_vocab=RESTRICT_VOCAB)
+    if word_vectors.vectors.dtype != np.float32:
+        return scan_most_similar(word_vectors, word, topn=top_n, restrict_vocab=RESTRICT_VOCAB)
+    return word_vectors.most_similar(word, topn=top_n, restrict_vocab=RESTRICT_VOCAB)
+
+def most_similar(word: str, top_n: int) -> List[Tuple[str, float]]:
+    if neighbor_index is not None:
+        return neighbor_index.most_similar(word, topn=top_n)
+    if shared_cache is None:
+        return scan_neighbors(word, top_n)
+
+    # Only worth sharing when the lookup is a full scan of the vocabulary
+    key = f"{top_n}:{word}"
+    neighbors = shared_cache.get_many('nbr', [key]).get(key)
+    if neighbors is None:
+        neighbors = [(hint, float(score)) for hint, score in scan_neighbors(word, top_n)]
+        shared_cache.set_many('nbr', {key: neighbors})
+    return [tuple(neighbor) for neighbor in neighbors]
+
+def expand_synonyms(neighbors: List[Tuple[str, float]]) -> List[str]:
+    candidates = set()
+    for hint, _ in neighbors:
+        candidates.update(get_synonyms(hint))  # Add synonyms for hint diversity
+    return sorted(candidates)
+
+def eligible_hints(candidates: List[str]) -> np.ndarray:
+    # Synonyms outside the vocabulary score 0.0 against every board word and can never pass a threshold
+    ids = vocab_ids(word_vectors, candidates)
+    ids = ids[(ids >= 0) & (ids < (RESTRICT_VOCAB or len(word_vectors)))]
+    if eligible_vocabulary is not None:
+        return ids[eligible_vocabulary.mask[ids]]
+    # Without a mask each candidate is checked here: alphabetic, not a stopword, not a proper noun
+    index_to_key = word_vectors.index_to_key
+    ids = ids[np.fromiter((index_to_key[i].isalpha() and index_to_key[i].lower() not in stop_words for i in ids.tolist()), dtype=bool, count=len(ids))]
+    return ids[~np.array(proper_nouns.flags(index_to_key[i] for i in ids.tolist()), dtype=bool)]
+
+def compute_word_candidates(word: str, top_n: int = 100) -> np.ndarray:
+    # Everything here is independent of the board, so results can be precomputed per word
+    with stage_seconds.time(stage='candidates'):
+        neighbors = most_similar(word, top_n)
+    with stage_seconds.time(stage='synonyms'):
+        candidates = expand_synonyms(neighbors)
+    with stage_seconds.time(stage='pos_filter'):
+        # Resolved to vocabulary ids here; every later stage works on ids
+        return eligible_hints(candidates)
+
+def get_candidates(words: List[str], top_n: int = 100) -> Dict[str, np.ndarray]:
+    # Returned in the order of words, whichever tier answered each one, so hint order never depends on cache state
+    candidates = {}
     for word in words:
-        if word in word_vectors:
-            similar_words = word_vectors.most_similar(word, topn=top_n)
-            for hint, _ in similar_words:
-                synonyms = get_synonyms(hint)  # Add synonyms for hint diversity
-                for synonym in synonyms:
-                    if synonym.isalpha() and is_valid_hint(synonym, all_board_words) and not is_ambiguous_hint(synonym):
-                        hints.add(synonym)
-    return list(hints)
-
-def find_strategic_hints(my_words: List[str], opponent_words: List[str], neutral_words: List[str], assassin_word: str) -> Dict[int, List[Tuple[str, float, List[str]]]]:
-    all_board_words = set(my_words + opponent_words + neutral_words + [assassin_word])
+        if pool_cache is not None and pool_cache.covers(word, top_n):
+            candidates[word] = pool_cache.candidate_ids(word)
+
+    missing = [word for word in words if word not in candidates]
+    if shared_cache is not None and missing:
+        # A single multi-get covers every board word the pool cache did not
+        shared = shared_cache.get_many('cand-ids', [f"{top_n}:{word}" for word in missing])
+        candidates.update((word, np.array(shared[f"{top_n}:{word}"], dtype=np.int32)) for word in missing if f"{top_n}:{word}" in shared)
 
-    valid_hints = get_valid_hints(my_words, all_board_words)
-    strategic_hints = {2: [], 3: [], 4: []}
+    computed = {word: compute_word_candidates(word, top_n) for word in missing if word not in candidates}
+    if shared_cache is not None and computed:
+        shared_cache.set_many('cand-ids', {f"{top_n}:{word}": ids.tolist() for word, ids in computed.items()})
+    candidates.update(computed)
+    return {word: candidates[word] for word in words}
 
-    for num_words in range(4, 1, -1):
-        for words_combo in combinations(my_words, num_words):
-            for hint in valid_hints:
-                coherence_score = calculate_weighted_coherence(hint, words_combo)
-                opponent_score = max((get_similarity(hint, w) for w in opponent_words), default=0)
-                assassin_score = get_similarity(hint, assassin_word)
-                
-                dynamic_threshold = adaptive_threshold(num_words)
+def filter_hints(candidates: List[np.ndarray], all_board_words: set) -> np.ndarray:
+    # Deduplicated in first-seen order, so equal inputs always produce the same hint order
+    with stage_seconds.time(stage='board_filter'):
+        ids = np.concatenate(candidates) if len(candidates) else np.zeros(0, dtype=np.int32)
+        _, first = np.unique(ids, return_index=True)
+        ids = ids[np.sort(first)]
+        index_to_key = word_vectors.index_to_key
+        board_filter = BoardFilter(all_board_words, stop_words)
+        valid = np.fromiter((board_filter.allows(index_to_key[hint_id]) for hint_id in ids.tolist()), dtype=bool, count=len(ids))
+    return ids[valid]
 
-                if coherence_score > dynamic_threshold and coherence_score > opponent_score and coherence_score > assassin_score:
-                    strategic_hints[num_words].append((hint, coherence_score, list(words_combo)))
+def get_valid_hints(words: List[str], all_board_words: set, top_n: int = 100) -> np.ndarray:
+    return filter_hints(list(get_candidates([word for word in words if word in word_vectors], top_n).values()), all_board_words)
 
-    for num_words in strategic_hints:
-        strategic_hints[num_words].sort(key=lambda x: x[1], reverse=True)
-        strategic_hints[num_words] = strategic_hints[num_words][:5]  # Keep top 5 hints
+def label_hints(results: Dict[int, List[Tuple[int, float, Tuple[int, ...]]]], hint_ids: np.ndarray, my_words: List[str]) -> Dict[int, List[Tuple[str, float, List[str]]]]:
+    # The only place ids turn back into strings, and only for the hints that made the response
+    index_to_key = word_vectors.index_to_key
+    return {num_words: [(index_to_key[hint_ids[row]], score, [my_words[i] for i in combo]) for row, score, combo in clues] for num_words, clues in results.items()}
 
-    return strategic_hints
+def find_strategic_hints(my_words: List[str], opponent_words: List[str], neutral_words: List[str], assassin_word: str, top_k: int = DEFAULT_TOP_K, search: str = 'pruned', stats: Optional[SearchStats] = None, max_clue_size: int = DEFAULT_MAX_CLUE_SIZE) -> Dict[int, List[Tuple[str, float, List[str]]]]:
+    all_board_words = set(my_words + opponent_words + neutral_words + [assassin_word])
+
+    board_ids = vocab_ids(word_vectors, my_words + opponent_words + [assassin_word])
+    hint_ids = get_valid_hints(my_words, all_board_words)
+    stats = stats if stats is not None else SearchStats()
+    with stage_seconds.time(stage='scoring'):
+        sims = id_similarity_matrix(word_vectors, hint_ids, board_ids)
+    with stage_seconds.time(stage='ranking'):
+        results = search_similarities(sims, len(my_words), len(opponent_words), top_k=top_k, search=search, stats=stats, max_clue_size=max_clue_size)
+    record_search(len(hint_ids), stats)
+    return label_hints(results, hint_ids, my_words)
 
 @app.route('/generate-hints', methods=['POST', 'OPTIONS'])
 def generate_hints():
@@ -116,28 +263,164 @@ def generate_hints():
         if origin in ["http://localhost:3000", "https://codecracker-seven.vercel.app"]:
             response.headers.add('Access-Control-Allow-Origin', origin)
         response.headers.add('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type, If-None-Match, X-Codecracker-Profile')
         return response
 
     try:
-        data = request.json
-        my_words = data.get('my_words', [])
-        opponent_words = data.get('opponent_words', [])
-        neutral_words = data.get('neutral_words', [])
-        assassin_word = data.get('assassin_word', '')
-
-        if not my_words:
-            return jsonify({"error": "No words provided"}), 400
-
-        hints = find_strategic_hints(my_words, opponent_words, neutral_words, assassin_word)
-        
-        response = jsonify(hints)
+        params, error = parse_hint_request(request.json)
+        if error:
+            return jsonify({"error": error}), 400
+        board_key = canonical_hash(dict(params, model=CACHE_NAMESPACE))
+
+        profile_key = request.headers.get('X-Codecracker-Profile') or request.args.get('profile')
+        if profile_key:
+            if not is_authorized(profile_key, PROFILE_KEYS):
+                return jsonify({"error": "Profiling is not allowed with this key"}), 403
+            # Skips every cache so the profile shows the full pipeline; the collapsed stacks ride along in the body
+            stats = SearchStats() if params['include_stats'] else None
+            with SamplingProfiler(PROFILE_INTERVAL) as profiler:
+                hints = find_strategic_hints(params['my_words'], params['opponent_words'], params['neutral_words'], params['assassin_word'], top_k=params['top_k'], search=params['search'], stats=stats, max_clue_size=params['max_clue_size'])
+            body = hints_body(hints, stats)
+            body['profile'] = profiler.collapsed()
+            response = jsonify(body)
+        elif request.if_none_match.contains(board_key):
+            # The hints are a pure function of the key, so the client's copy is current
+            response = make_response('', 304)
+            response.set_etag(board_key)
+        else:
+            body = response_cache.get(board_key)
+            if body is None:
+                stats = SearchStats() if params['include_stats'] else None
+                hints = find_strategic_hints(params['my_words'], params['opponent_words'], params['neutral_words'], params['assassin_word'], top_k=params['top_k'], search=params['search'], stats=stats, max_clue_size=params['max_clue_size'])
+                body = hints_body(hints, stats)
+                response_cache.put(board_key, body)
+            response = jsonify(body)
+            response.set_etag(board_key)
+
         origin = request.headers.get('Origin')
         if origin in ["http://localhost:3000", "https://codecracker-seven.vercel.app"]:
             response.headers.add('Access-Control-Allow-Origin', origin)
+            response.headers.add('Access-Control-Expose-Headers', 'ETag')
         return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def score_board_group(boards: List[dict]) -> Iterator[Tuple[dict, dict]]:
+    # Candidates are fetched once for every team word in the group. Each board's similarity matrix is its own product,
+    # exactly as find_strategic_hints computes it: a group-wide product rounds differently, and the two paths share cached bodies
+    team_words = sorted({word for params in boards for word in params['my_words'] if word in word_vectors})
+    candidates = get_candidates(team_words)
+
+    for params in boards:
+        all_board_words = set(params['my_words'] + params['opponent_words'] + params['neutral_words'] + [params['assassin_word']])
+        hint_ids = filter_hints([candidates[word] for word in params['my_words'] if word in candidates], all_board_words)
+        board_ids = vocab_ids(word_vectors, params['my_words'] + params['opponent_words'] + [params['assassin_word']])
+        with stage_seconds.time(stage='scoring'):
+            board_sims = id_similarity_matrix(word_vectors, hint_ids, board_ids)
+        stats = SearchStats()
+        with stage_seconds.time(stage='ranking'):
+            results = search_similarities(board_sims, len(params['my_words']), len(params['opponent_words']), top_k=params['top_k'], search=params['search'], stats=stats, max_clue_size=params['max_clue_size'])
+        record_search(len(hint_ids), stats)
+        yield params, hints_body(label_hints(results, hint_ids, params['my_words']), stats if params['include_stats'] else None)
+
+def solve_batch(boards: list) -> Iterator[dict]:
+    for start in range(0, len(boards), BATCH_GROUP):
+        results = {}
+        pending = {}
+        for index, board in enumerate(boards[start:start + BATCH_GROUP], start):
+            try:
+                params, error = parse_hint_request(board)
+            except Exception as e:
+                params, error = None, str(e)
+            if error:
+                results[index] = {"index": index, "error": error}
+                continue
+            board_key = canonical_hash(dict(params, model=CACHE_NAMESPACE))
+            body = response_cache.get(board_key)
+            if body is not None:
+                results[index] = {"index": index, "hints": body}
+            else:
+                # Repeated boards in the batch are scored once
+                pending.setdefault(board_key, (params, []))[1].append(index)
+
+        for index in sorted(results):
+            yield results[index]
+        board_keys = list(pending)
+        scored = 0
+        try:
+            for board_key, (_, body) in zip(board_keys, score_board_group([params for params, _ in pending.values()])):
+                response_cache.put(board_key, body)
+                for index in pending[board_key][1]:
+                    yield {"index": index, "hints": body}
+                scored += 1
+        except Exception as e:
+            for board_key in board_keys[scored:]:
+                for index in pending[board_key][1]:
+                    yield {"index": index, "error": str(e)}
+
+def generate_batch(boards: list) -> Iterator[str]:
+    for result in solve_batch(boards):
+        yield json.dumps(result) + '\n'
+
+@app.route('/generate-hints/batch', methods=['POST'])
+def generate_hints_batch():
+    # One NDJSON line per board, written as soon as its group is scored; lines carry the board's index in the request
+    data = request.json
+    boards = data.get('boards') if isinstance(data, dict) else data
+    if not isinstance(boards, list) or not boards:
+        return jsonify({"error": "Expected a non-empty array of boards"}), 400
+    if len(boards) > BATCH_LIMIT:
+        return jsonify({"error": f"At most {BATCH_LIMIT} boards per batch"}), 400
+    return Response(stream_with_context(generate_batch(boards)), mimetype='application/x-ndjson')
+
+@app.route('/games/<game_id>/hints', methods=['POST'])
+def game_hints(game_id: str):
+    # Same request and response as /generate-hints, but the game's similarity columns are kept between turns
+    try:
+        params, error = parse_hint_request(request.json)
+        if error:
+            return jsonify({"error": error}), 400
+        my_words, opponent_words = params['my_words'], params['opponent_words']
+        all_board_words = set(my_words + opponent_words + params['neutral_words'] + [params['assassin_word']])
+
+        session = game_sessions.get_or_create(game_id, lambda: GameSession(word_vectors))
+
+        with session.lock:
+            session.add_candidates(get_candidates(session.missing_candidates(my_words)))
+            scored_words = my_words + opponent_words + [params['assassin_word']]
+            board_ids = vocab_ids(word_vectors, scored_words)
+            hint_ids = filter_hints([session.candidate_hints(my_words)], all_board_words)
+            with stage_seconds.time(stage='scoring'):
+                session.update_board(scored_words, board_ids)
+                sims = session.similarities(hint_ids, board_ids)
+
+        stats = SearchStats()
+        with stage_seconds.time(stage='ranking'):
+            results = search_similarities(sims, len(my_words), len(opponent_words), top_k=params['top_k'], search=params['search'], stats=stats, max_clue_size=params['max_clue_size'])
+        record_search(len(hint_ids), stats)
+        return jsonify(hints_body(label_hints(results, hint_ids, my_words), stats if params['include_stats'] else None))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/games/<game_id>', methods=['DELETE'])
+def end_game(game_id: str):
+    game_sessions.pop(game_id)
+    return '', 204
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    # Streamed batch responses are timed up to their first byte
+    if 'request_start' in g:
+        request_seconds.observe(time.perf_counter() - g.request_start, endpoint=request.endpoint or 'unknown', status=response.status_code)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from cache import LRUCache, canonical_hash
+from protocol import ALLOWED_ORIGINS, parse_hint_request
+
+# Serve with `uvicorn asgi:app`. Scoring runs in worker processes that each import app.py once, so
+# set CODECRACKER_VECTORS or CODECRACKER_ASSETS to let every worker map the same vectors instead of copying them
+
+# Worker processes doing the scoring
+WORKERS = int(os.environ.get('CODECRACKER_ASGI_WORKERS', os.cpu_count() or 1))
+# Requests allowed to wait for a worker before new ones are turned away with a 503
+QUEUE_SIZE = int(os.environ.get('CODECRACKER_ASGI_QUEUE', WORKERS * 4))
+# Seconds a client is told to wait before retrying a 503
+RETRY_AFTER = int(os.environ.get('CODECRACKER_ASGI_RETRY_AFTER', 1))
+RESPONSE_CACHE_SIZE = int(os.environ.get('CODECRACKER_RESPONSE_CACHE_SIZE', 1024))
+RESPONSE_CACHE_TTL = float(os.environ.get('CODECRACKER_RESPONSE_CACHE_TTL', 600))
+
+hint_app = None
+
+def init_worker() -> None:
+    global hint_app
+    import app  # Loads the vectors and lookup tables once per worker process
+    hint_app = app
+
+def worker_namespace() -> str:
+    return hint_app.CACHE_NAMESPACE
+
+def score_request(params: dict) -> dict:
+    stats = hint_app.SearchStats() if params['include_stats'] else None
+    hints = hint_app.find_strategic_hints(params['my_words'], params['opponent_words'], params['neutral_words'], params['assassin_word'], top_k=params['top_k'], search=params['search'], stats=stats, max_clue_size=params['max_clue_size'])
+    return hint_app.hints_body(hints, stats)
+
+class HintServer:
+    def __init__(self, workers: int = WORKERS, queue_size: int = QUEUE_SIZE):
+        self.workers = workers
+        self.limit = workers + queue_size
+        self.pending = 0
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.namespace = None
+        self.response_cache = LRUCache(RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+    async def startup(self) -> None:
+        # Spawned rather than forked, so workers never inherit the event loop
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=init_worker)
+        loop = asyncio.get_running_loop()
+        # Waiting on one worker per slot makes every worker load its model before the first request
+        namespaces = await asyncio.gather(*(loop.run_in_executor(self.pool, worker_namespace) for _ in range(self.workers)))
+        self.namespace = namespaces[0]
+        print(f"Started {self.workers} scoring workers")
+
+    async def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def http(self, scope, receive, send):
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        cors = []
+        if headers.get('origin') in ALLOWED_ORIGINS:
+            cors = [('Access-Control-Allow-Origin', headers['origin']), ('Vary', 'Origin')]
+
+        if scope['path'] != '/generate-hints':
+            await respond(send, 404, {"error": "Not found"})
+            return
+        if scope['method'] == 'OPTIONS':
+            await respond(send, 200, None, cors + [
+                ('Access-Control-Allow-Methods', 'POST, OPTIONS'),
+                ('Access-Control-Allow-Headers', 'Content-Type, If-None-Match'),
+            ])
+            return
+        if scope['method'] != 'POST':
+            await respond(send, 405, {"error": "Method not allowed"}, [('Allow', 'POST, OPTIONS')])
+            return
+
+        cors.append(('Access-Control-Expose-Headers', 'ETag'))
+        try:
+            params, error = parse_hint_request(json.loads(await read_body(receive)))
+        except ValueError:
+            params, error = None, "Request body must be JSON"
+        except Exception as e:
+            await respond(send, 500, {"error": str(e)}, cors)
+            return
+        if error:
+            await respond(send, 400, {"error": error}, cors)
+            return
+
+        board_key = canonical_hash(dict(params, model=self.namespace))
+        etag = [('ETag', f'"{board_key}"')]
+        client_tags = parse_etags(headers.get('if-none-match', ''))
+        if board_key in client_tags or '*' in client_tags:
+            await respond(send, 304, None, cors + etag)
+            return
+
+        body = self.response_cache.get(board_key)
+        if body is None:
+            if self.pending >= self.limit:
+                # Every worker is busy and the queue is full; shed the request instead of letting latency grow
+                await respond(send, 503, {"error": "Server busy, try again shortly"}, cors + [('Retry-After', str(RETRY_AFTER))])
+                return
+            self.pending += 1
+            try:
+                body = await asyncio.get_running_loop().run_in_executor(self.pool, score_request, params)
+            except Exception as e:
+                await respond(send, 500, {"error": str(e)}, cors)
+                return
+            finally:
+                self.pending -= 1
+            self.response_cache.put(board_key, body)
+        await respond(send, 200, body, cors + etag)
+
+def parse_etags(header: str) -> List[str]:
+    return [tag.strip().removeprefix('W/').strip('"') for tag in header.split(',') if tag.strip()]
+
+async def read_body(receive) -> bytes:
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+async def respond(send, status: int, body: Optional[dict], headers: List[Tuple[str, str]] = ()) -> None:
+    # Same encoding as Flask's jsonify: sorted keys, compact separators
+    payload = json.dumps(body, sort_keys=True, separators=(',', ':')).encode('utf-8') + b'\n' if body is not None else b''
+    response_headers = [(b'content-length', str(len(payload)).encode('latin-1'))]
+    if body is not None:
+        response_headers.append((b'content-type', b'application/json'))
+    response_headers += [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': payload})
+
+app = HintServer()
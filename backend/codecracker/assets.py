@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import nltk
+import numpy as np
+from gensim.models import KeyedVectors
+from embeddings import convert_vectors, load_vectors
+from neighbors import EligibleVocabulary, NeighborIndex, build_eligible_vocabulary, build_neighbor_index, TABLE_ROWS
+from lexicon import ProperNounFilter, SynonymTable, build_proper_noun_table, compile_synonyms, eligibility_mask
+
+# Bump whenever the bundle layout or the set of packaged assets changes
+ASSET_VERSION = 2
+MANIFEST_NAME = 'manifest.json'
+NLTK_PACKAGES = ['averaged_perceptron_tagger_eng', 'averaged_perceptron_tagger', 'stopwords', 'wordnet']
+
+class AssetError(Exception):
+    pass
+
+@dataclass
+class AssetBundle:
+    path: str
+    manifest: dict
+    word_vectors: Optional[KeyedVectors] = None
+    neighbor_index: Optional[NeighborIndex] = None
+    proper_nouns: Optional[ProperNounFilter] = None
+    synonym_table: Optional[SynonymTable] = None
+    eligible_vocabulary: Optional[EligibleVocabulary] = None
+    stop_words: set = field(default_factory=set)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+def bundle_path(root: str, model_name: str, version: int = ASSET_VERSION) -> str:
+    return os.path.join(root, f"{model_name}-v{version}")
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def bundle_files(bundle: str):
+    for dirpath, _, filenames in os.walk(bundle):
+        for filename in sorted(filenames):
+            relpath = os.path.relpath(os.path.join(dirpath, filename), bundle)
+            if relpath != MANIFEST_NAME:
+                yield relpath
+
+def write_manifest(bundle: str, model_name: str, vectors: str, neighbors: Optional[str] = None, proper_nouns: Optional[str] = None, synonyms: Optional[str] = None, eligible: Optional[str] = None) -> dict:
+    manifest = {
+        'version': ASSET_VERSION,
+        'model': model_name,
+        'vectors': vectors,
+        'neighbors': neighbors,
+        'proper_nouns': proper_nouns,
+        'synonyms': synonyms,
+        'eligible': eligible,
+        'nltk_data': 'nltk_data',
+        'files': {relpath: file_checksum(os.path.join(bundle, relpath)) for relpath in sorted(bundle_files(bundle))},
+    }
+    with open(os.path.join(bundle, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def read_manifest(bundle: str) -> dict:
+    try:
+        with open(os.path.join(bundle, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise AssetError(f"No {MANIFEST_NAME} in {bundle}; run `python manage.py prepare-assets` first")
+    if manifest.get('version') != ASSET_VERSION:
+        raise AssetError(f"Asset bundle {bundle} is version {manifest.get('version')}, expected {ASSET_VERSION}")
+    return manifest
+
+def verify_assets(bundle: str, manifest: dict) -> None:
+    for relpath, checksum in manifest['files'].items():
+        path = os.path.join(bundle, relpath)
+        if not os.path.exists(path):
+            raise AssetError(f"Missing asset {relpath} in {bundle}")
+        if file_checksum(path) != checksum:
+            raise AssetError(f"Checksum mismatch for asset {relpath} in {bundle}")
+
+def prepare_assets(root: str, model_name: str, source: Optional[str] = None, neighbor_rows: int = TABLE_ROWS) -> str:
+    bundle = bundle_path(root, model_name)
+    nltk_dir = os.path.join(bundle, 'nltk_data')
+    for package in NLTK_PACKAGES:
+        if not nltk.download(package, download_dir=nltk_dir, quiet=True, raise_on_error=True):
+            raise AssetError(f"Could not download NLTK package {package}")
+
+    vectors = os.path.join('vectors', f"{model_name}.kv")
+    convert_vectors(source or model_name, os.path.join(bundle, vectors))
+
+    word_vectors = load_vectors(os.path.join(bundle, vectors))
+    proper_nouns = 'proper_nouns.npy'
+    nltk.data.path.insert(0, nltk_dir)
+    from nltk.corpus import stopwords
+    build_proper_noun_table(word_vectors, os.path.join(bundle, proper_nouns))
+    eligible = 'eligible'
+    mask = eligibility_mask(word_vectors, set(stopwords.words('english')), np.load(os.path.join(bundle, proper_nouns)))
+    build_eligible_vocabulary(word_vectors, mask, os.path.join(bundle, eligible))
+
+    neighbors = None
+    if neighbor_rows:
+        neighbors = 'neighbors'
+        build_neighbor_index(word_vectors, os.path.join(bundle, neighbors), rows=neighbor_rows, eligible=mask)
+    synonyms = 'synonyms'
+    compile_synonyms(word_vectors, os.path.join(bundle, synonyms))
+
+    write_manifest(bundle, model_name, vectors, neighbors, proper_nouns, synonyms, eligible)
+    print(f"Prepared asset bundle {bundle}")
+    return bundle
+
+def load_offline_assets(bundle: str, verify: bool = True) -> AssetBundle:
+    assets = AssetBundle(path=bundle, manifest=read_manifest(bundle))
+
+    def timed(name, load):
+        start = time.perf_counter()
+        result = load()
+        assets.timings[name] = time.perf_counter() - start
+        return result
+
+    if verify:
+        timed('checksums', lambda: verify_assets(bundle, assets.manifest))
+
+    # Only the bundle is searched, so a missing corpus fails here instead of reaching for the network
+    nltk.data.path[:] = [os.path.join(bundle, assets.manifest['nltk_data'])]
+    from nltk.corpus import stopwords, wordnet
+
+    assets.word_vectors = timed('vectors', lambda: load_vectors(os.path.join(bundle, assets.manifest['vectors'])))
+    if assets.manifest.get('neighbors'):
+        neighbors = os.path.join(bundle, assets.manifest['neighbors'])
+        assets.neighbor_index = timed('neighbors', lambda: NeighborIndex.load(neighbors, assets.word_vectors))
+    if assets.manifest.get('proper_nouns'):
+        proper_nouns = os.path.join(bundle, assets.manifest['proper_nouns'])
+        assets.proper_nouns = timed('proper_nouns', lambda: ProperNounFilter.load(proper_nouns, assets.word_vectors))
+    else:
+        assets.proper_nouns = ProperNounFilter(assets.word_vectors)
+    if assets.manifest.get('eligible'):
+        eligible = os.path.join(bundle, assets.manifest['eligible'])
+        assets.eligible_vocabulary = timed('eligible', lambda: EligibleVocabulary.load(eligible, assets.word_vectors))
+    if assets.manifest.get('synonyms'):
+        synonyms = os.path.join(bundle, assets.manifest['synonyms'])
+        assets.synonym_table = timed('synonyms', lambda: SynonymTable.load(synonyms, assets.word_vectors))
+    assets.stop_words = timed('stopwords', lambda: set(stopwords.words('english')))
+    timed('wordnet', wordnet.ensure_loaded)
+    timed('tagger', lambda: nltk.pos_tag(['warmup']))
+
+    for name, seconds in assets.timings.items():
+        print(f"Loaded {name} in {seconds * 1000:.1f}ms")
+    return assets
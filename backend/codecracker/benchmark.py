@@ -0,0 +1,165 @@
+import json
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+from pool import read_word_pool
+from scoring import id_similarity_matrix, search_similarities, vocab_ids
+
+STAGES = ('candidates', 'synonyms', 'pos_filter', 'board_filter', 'scoring', 'ranking')
+PERCENTILES = (50, 95, 99)
+# Codenames deals 9 words to the starting team, 8 to the other, 7 neutral and 1 assassin
+BOARD_SHAPE = (9, 8, 7, 1)
+# Compared against the baseline; p99 of a few hundred boards is too noisy to gate on
+GATED_PERCENTILES = ('p50', 'p95')
+DEFAULT_TOLERANCE = 0.2
+
+def make_boards(count: int, seed: int = 0, pool: Optional[List[str]] = None) -> List[dict]:
+    pool = pool or read_word_pool()
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        words = rng.sample(pool, sum(BOARD_SHAPE))
+        mine, opponent, neutral, _ = np.cumsum(BOARD_SHAPE)
+        boards.append({
+            'my_words': words[:mine],
+            'opponent_words': words[mine:opponent],
+            'neutral_words': words[opponent:neutral],
+            'assassin_word': words[neutral],
+        })
+    return boards
+
+def run_board(hint_app, board: dict, timings: Dict[str, float], top_n: int = 100) -> dict:
+    # The same steps find_strategic_hints takes, with the pool and shared caches bypassed so every stage does its work
+    @contextmanager
+    def stage(name):
+        start = time.perf_counter()
+        yield
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+    my_words, opponent_words = board['my_words'], board['opponent_words']
+    word_vectors = hint_app.word_vectors
+    candidates = []
+    for word in my_words:
+        if word not in word_vectors:
+            continue
+        with stage('candidates'):
+            # Not hint_app.most_similar, which reads and writes the shared cache's neighbor tier
+            if hint_app.neighbor_index is not None:
+                neighbors = hint_app.neighbor_index.most_similar(word, topn=top_n)
+            else:
+                neighbors = hint_app.scan_neighbors(word, top_n)
+        with stage('synonyms'):
+            synonyms = hint_app.expand_synonyms(neighbors)
+        with stage('pos_filter'):
+            candidates.append(hint_app.eligible_hints(synonyms))
+
+    with stage('board_filter'):
+        all_board_words = set(my_words + opponent_words + board['neutral_words'] + [board['assassin_word']])
+        hint_ids = hint_app.filter_hints(candidates, all_board_words)
+    with stage('scoring'):
+        sims = id_similarity_matrix(word_vectors, hint_ids, vocab_ids(word_vectors, my_words + opponent_words + [board['assassin_word']]))
+    with stage('ranking'):
+        return hint_app.label_hints(search_similarities(sims, len(my_words), len(opponent_words)), hint_ids, my_words)
+
+def summarize(samples: List[float], scale: float = 1.0) -> dict:
+    summary = {f"p{q}": float(np.percentile(samples, q)) * scale for q in PERCENTILES}
+    summary['mean'] = float(np.mean(samples)) * scale
+    return summary
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports kilobytes
+
+def run_benchmark(hint_app, boards: List[dict], warmup: int = 3, allocations: bool = True) -> dict:
+    for board in boards[:warmup]:
+        run_board(hint_app, board, {})
+
+    samples = {name: [] for name in STAGES + ('total',)}
+    for board in boards:
+        timings = dict.fromkeys(STAGES, 0.0)
+        run_board(hint_app, board, timings)
+        for name in STAGES:
+            samples[name].append(timings[name])
+        samples['total'].append(sum(timings.values()))
+
+    report = {
+        'boards': len(boards),
+        'latency_ms': {name: summarize(values, 1000) for name, values in samples.items()},
+    }
+    if allocations:
+        # A separate pass, since tracing every allocation slows the timed one down several times over
+        peaks = []
+        tracemalloc.start()
+        for board in boards:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            run_board(hint_app, board, {})
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+        report['allocated_peak_kb'] = summarize(peaks, 1 / 1024)
+    report['peak_rss_mb'] = peak_rss_bytes() / 2 ** 20
+    return report
+
+def collect_hints(hint_app, boards: List[dict]) -> List[dict]:
+    # Round-tripped through JSON so hints from this run and from a file compare alike
+    return json.loads(json.dumps([run_board(hint_app, board, {}) for board in boards]))
+
+def compare_hints(hints: List[dict], reference: List[dict]) -> dict:
+    # How far one run's hints are from a reference run over the same boards, e.g. a quantized store against float32
+    same_top, overlaps, deltas = [], [], []
+    for found_sizes, expected_sizes in zip(hints, reference):
+        for size, expected in expected_sizes.items():
+            found = found_sizes.get(size, [])
+            same_top.append(found[0][0] == expected[0][0] if found and expected else not found and not expected)
+            found_words, expected_words = {clue[0] for clue in found}, {clue[0] for clue in expected}
+            overlaps.append(len(found_words & expected_words) / len(found_words | expected_words) if found_words | expected_words else 1.0)
+            scores = {(clue[0], tuple(clue[2])): clue[1] for clue in found}
+            deltas.extend(abs(scores[clue[0], tuple(clue[2])] - clue[1]) for clue in expected if (clue[0], tuple(clue[2])) in scores)
+    return {
+        'clue_sizes': len(same_top),
+        'same_top_hint': float(np.mean(same_top)) if same_top else 1.0,
+        'hint_overlap': float(np.mean(overlaps)) if overlaps else 1.0,
+        'score_delta': {'mean': float(np.mean(deltas)) if deltas else 0.0, 'max': max(deltas, default=0.0)},
+    }
+
+def print_report(report: dict) -> None:
+    print(f"{report['boards']} boards")
+    print(f"{'stage':<14}" + ''.join(f"{key:>10}" for key in ('p50', 'p95', 'p99', 'mean')) + "  (ms)")
+    for name, summary in report['latency_ms'].items():
+        print(f"{name:<14}" + ''.join(f"{summary[key]:>10.3f}" for key in ('p50', 'p95', 'p99', 'mean')))
+    if 'allocated_peak_kb' in report:
+        print(f"Peak allocations per board: {report['allocated_peak_kb']['p50']:.0f} KB p50, {report['allocated_peak_kb']['p99']:.0f} KB p99")
+    print(f"Peak RSS: {report['peak_rss_mb']:.0f} MB")
+    if 'accuracy' in report:
+        accuracy = report['accuracy']
+        print(f"Against reference hints: same top hint for {accuracy['same_top_hint']:.1%} of {accuracy['clue_sizes']} clue sizes, "
+              f"hint overlap {accuracy['hint_overlap']:.3f}, score delta mean {accuracy['score_delta']['mean']:.1e} max {accuracy['score_delta']['max']:.1e}")
+
+def compare_reports(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    # Every regression beyond the tolerance, as readable lines; an empty list means the run passes
+    regressions = []
+    for name, summary in baseline['latency_ms'].items():
+        for key in GATED_PERCENTILES:
+            current = report['latency_ms'].get(name, {}).get(key)
+            if current is not None and current > summary[key] * (1 + tolerance):
+                regressions.append(f"{name} {key}: {current:.3f} ms vs {summary[key]:.3f} ms baseline")
+    if 'allocated_peak_kb' in baseline and 'allocated_peak_kb' in report:
+        current, previous = report['allocated_peak_kb']['p50'], baseline['allocated_peak_kb']['p50']
+        if current > previous * (1 + tolerance):
+            regressions.append(f"allocations p50: {current:.0f} KB vs {previous:.0f} KB baseline")
+    if report['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + tolerance):
+        regressions.append(f"peak RSS: {report['peak_rss_mb']:.0f} MB vs {baseline['peak_rss_mb']:.0f} MB baseline")
+    return regressions
+
+def read_report(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def write_report(report: dict, path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
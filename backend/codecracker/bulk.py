@@ -0,0 +1,168 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import Iterator, List, Optional
+
+CHUNK_SIZE = 1000
+# CSV cells hold word lists joined with this separator, or a JSON array
+CSV_LIST_SEPARATOR = ';'
+CSV_LIST_FIELDS = ('my_words', 'opponent_words', 'neutral_words')
+CSV_INT_FIELDS = ('top_k', 'max_clue_size')
+
+hint_app = None
+
+def init_worker() -> None:
+    global hint_app
+    import app  # Loads the models configured through the CODECRACKER_* environment variables
+    hint_app = app
+
+def solve_chunk(chunk: List[dict]) -> List[dict]:
+    results = sorted(hint_app.solve_batch(chunk), key=lambda result: result['index'])
+    for board, result in zip(chunk, results):
+        if isinstance(board, dict) and 'id' in board:
+            result['id'] = board['id']
+    return results
+
+def parse_csv_list(cell: str) -> List[str]:
+    cell = cell.strip()
+    if cell.startswith('['):
+        return json.loads(cell)
+    return [word.strip() for word in cell.split(CSV_LIST_SEPARATOR) if word.strip()]
+
+def read_boards(path: str) -> Iterator[dict]:
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            for row in csv.DictReader(f):
+                board = {key: value for key, value in row.items() if value not in (None, '')}
+                for field in CSV_LIST_FIELDS:
+                    board[field] = parse_csv_list(board.get(field, ''))
+                for field in CSV_INT_FIELDS:
+                    if field in board:
+                        board[field] = int(board[field])
+                if 'include_stats' in board:
+                    board['include_stats'] = board['include_stats'].lower() in ('1', 'true', 'yes')
+                yield board
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def chunks(boards: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    while True:
+        chunk = list(islice(boards, size))
+        if not chunk:
+            return
+        yield chunk
+
+class JsonlWriter:
+    def __init__(self, path: str, offset: int):
+        # Anything past the checkpointed offset is from a run that died mid-chunk
+        self.file = open(path, 'r+b' if offset else 'wb')
+        self.file.truncate(offset)
+        self.file.seek(offset)
+
+    def write(self, results: List[dict], chunk_index: int) -> int:
+        self.file.write(''.join(json.dumps(result) + '\n' for result in results).encode('utf-8'))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self) -> None:
+        self.file.close()
+
+class ParquetWriter:
+    # A directory of one part file per chunk, which pyarrow and pandas read as a single dataset
+    def __init__(self, path: str, offset: int):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, results: List[dict], chunk_index: int) -> int:
+        table = self.pa.table({
+            'index': self.pa.array([result['index'] for result in results], type=self.pa.int64()),
+            'id': self.pa.array([None if result.get('id') is None else str(result['id']) for result in results], type=self.pa.string()),
+            'hints': self.pa.array([json.dumps(result['hints']) if 'hints' in result else None for result in results], type=self.pa.string()),
+            'error': self.pa.array([result.get('error') for result in results], type=self.pa.string()),
+        })
+        part = os.path.join(self.path, f"part-{chunk_index:06d}.parquet")
+        self.pq.write_table(table, part + '.tmp')
+        os.replace(part + '.tmp', part)
+        return 0
+
+    def close(self) -> None:
+        pass
+
+def read_checkpoint(path: str, input_path: str, chunk_size: int) -> dict:
+    if not os.path.exists(path):
+        return {'input': os.path.abspath(input_path), 'chunk_size': chunk_size, 'chunks': 0, 'boards': 0, 'offset': 0}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint['input'] != os.path.abspath(input_path) or checkpoint['chunk_size'] != chunk_size:
+        raise SystemExit(f"{path} belongs to a run over {checkpoint['input']} with chunk size {checkpoint['chunk_size']}; delete it to start over")
+    return checkpoint
+
+def write_checkpoint(path: str, checkpoint: dict) -> None:
+    with open(path + '.tmp', 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(path + '.tmp', path)
+
+def solve_in_order(pool, pending: Iterator[List[dict]], window: int) -> Iterator[List[dict]]:
+    # Pool.imap would read the whole input up front; this keeps only a few chunks in flight
+    in_flight = deque()
+    for chunk in pending:
+        in_flight.append(pool.apply_async(solve_chunk, (chunk,)))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().get()
+    while in_flight:
+        yield in_flight.popleft().get()
+
+def solve_file(input_path: str, output_path: str, workers: int = 1, chunk_size: int = CHUNK_SIZE, checkpoint_path: Optional[str] = None) -> int:
+    # Results keep the input order. Progress is checkpointed after every chunk, so rerunning the same command resumes
+    checkpoint_path = checkpoint_path or output_path.rstrip('/') + '.checkpoint'
+    checkpoint = read_checkpoint(checkpoint_path, input_path, chunk_size)
+    if checkpoint['chunks']:
+        print(f"Resuming after {checkpoint['boards']} boards")
+
+    boards = read_boards(input_path)
+    for _ in islice(boards, checkpoint['boards']):
+        pass
+    pending = chunks(boards, chunk_size)
+
+    writer_class = ParquetWriter if output_path.rstrip('/').endswith('.parquet') else JsonlWriter
+    writer = writer_class(output_path, checkpoint['offset'])
+    pool = None
+    if workers > 1:
+        # Each worker maps the same vector store; nothing is loaded in this process
+        pool = multiprocessing.Pool(workers, initializer=init_worker)
+        solved = solve_in_order(pool, pending, workers * 2)
+    else:
+        init_worker()
+        solved = map(solve_chunk, pending)
+
+    start = time.perf_counter()
+    done = 0
+    try:
+        for results in solved:
+            for result in results:
+                result['index'] += checkpoint['boards']
+            checkpoint['offset'] = writer.write(results, checkpoint['chunks'])
+            checkpoint['chunks'] += 1
+            checkpoint['boards'] += len(results)
+            write_checkpoint(checkpoint_path, checkpoint)
+            done += len(results)
+            print(f"Solved {checkpoint['boards']} boards ({done / (time.perf_counter() - start):.0f}/s)")
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.terminate()
+    return checkpoint['boards']
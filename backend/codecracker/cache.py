@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+MISSING = object()
+# Seconds between sweeps of expired rows from the local store, which lives in RAM on /dev/shm
+PURGE_INTERVAL = 60
+
+def canonical_hash(payload: Any) -> str:
+    # Same digest for equal payloads however their dict keys were ordered
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def artifact_fingerprint(path: str) -> List[list]:
+    # Name, size and mtime of every file in an artifact: cheap to take, and it changes whenever the artifact is rebuilt
+    if os.path.isfile(path):
+        files = [path]
+    else:
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    fingerprint = []
+    for file in files:
+        stat = os.stat(file)
+        fingerprint.append([os.path.relpath(file, os.path.dirname(path) if file == path else path), stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+class LRUCache:
+    # With a ttl, entries also expire that many seconds after they were stored, or with idle after they were last read
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, idle: bool = False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.idle = idle
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _deadline(self) -> Optional[float]:
+        return time.monotonic() + self.ttl if self.ttl is not None else None
+
+    def _lookup(self, key: Hashable) -> Any:
+        # Callers hold the lock
+        entry = self._data.get(key, MISSING)
+        if entry is not MISSING and self.ttl is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            entry = MISSING
+        if entry is MISSING:
+            self.misses += 1
+            return MISSING
+        if self.idle:
+            self._data[key] = (entry[0], self._deadline())
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        # Callers hold the lock
+        self._data[key] = (value, self._deadline())
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            return default if value is MISSING else value
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        # Atomic, so concurrent first lookups of a key all get the same new value
+        with self._lock:
+            value = self._lookup(key)
+            if value is MISSING:
+                value = factory()
+                if self.maxsize > 0:
+                    self._store(key, value)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._store(key, value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, MISSING)
+            return default if entry is MISSING else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+class RedisStore:
+    def __init__(self, url: str):
+        import redis  # Optional dependency, only needed when a Redis URL is configured
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys)
+
+    def set_many(self, items: Dict[str, bytes], ttl: int) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(key, value, ex=ttl)
+        pipeline.execute()
+
+class LocalStore:
+    # SQLite on tmpfs: every worker on the host shares one file-backed table without running a server
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+        self.connection.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires REAL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)')
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each worker process opens its own
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._pid = os.getpid()
+        return self._connection
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        placeholders = ','.join('?' * len(keys))
+        with self._lock:
+            rows = dict(self.connection.execute(f'SELECT key, value FROM cache WHERE expires > ? AND key IN ({placeholders})', [time.time(), *keys]).fetchall())
+        return [rows.get(key) for key in keys]
+
+    def set_many(self, items: Dict[str, bytes], ttl: int) -> None:
+        now = time.time()
+        with self._lock:
+            self.connection.executemany('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)', [(key, value, now + ttl) for key, value in items.items()])
+            # Reads already skip expired rows; this keeps them from piling up for the life of the host
+            if now >= self._next_purge:
+                self.connection.execute('DELETE FROM cache WHERE expires <= ?', (now,))
+                self._next_purge = now + PURGE_INTERVAL
+
+def default_local_path() -> str:
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, 'codecracker-cache.sqlite')
+
+class SharedCache:
+    def __init__(self, store, namespace: str, ttl: int = 86400):
+        self.store = store
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def key(self, kind: str, key: Any) -> str:
+        return f"{self.namespace}:{kind}:{key}"
+
+    def get_many(self, kind: str, keys: Sequence[Any]) -> Dict[Any, Any]:
+        # One round trip for the whole batch; missing keys are left out of the result
+        if not keys:
+            return {}
+        values = self.store.get_many([self.key(kind, key) for key in keys])
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, kind: str, items: Dict[Any, Any]) -> None:
+        if items:
+            self.store.set_many({self.key(kind, key): json.dumps(value) for key, value in items.items()}, self.ttl)
+
+def open_shared_cache(url: Optional[str], namespace: str, ttl: int = 86400) -> Optional[SharedCache]:
+    # url is a redis:// URL, or "local" / "local:<path>" for the host-local store
+    if not url:
+        return None
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        try:
+            return SharedCache(RedisStore(url), namespace, ttl)
+        except Exception as e:
+            print(f"Redis cache unavailable ({e}); falling back to the local shared store")
+            url = 'local'
+    path = url.partition(':')[2] or default_local_path()
+    return SharedCache(LocalStore(path), namespace, ttl)
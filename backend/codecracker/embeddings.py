@@ -0,0 +1,67 @@
+import os
+import time
+import numpy as np
+import gensim.downloader as api
+from gensim.models import KeyedVectors
+
+def load_source_vectors(source: str) -> KeyedVectors:
+    if not os.path.exists(source):
+        return api.load(source)  # A gensim-data model name such as 'glove-twitter-25'
+    if source.endswith(('.bin', '.bin.gz')):
+        return KeyedVectors.load_word2vec_format(source, binary=True)
+    if source.endswith(('.txt', '.txt.gz', '.vec', '.vec.gz')):
+        return KeyedVectors.load_word2vec_format(source, binary=False)
+    return KeyedVectors.load(source)
+
+# float32 keeps the source precision; float16 halves the store and int8 quarters it
+VECTOR_DTYPES = ('float32', 'float16', 'int8')
+ERROR_SAMPLE_PAIRS = 100000
+
+def quantize_rows(normed: np.ndarray, dtype: str) -> np.ndarray:
+    if dtype == 'int8':
+        # Symmetric per-row scale: each row's largest component maps to +-127
+        peaks = np.abs(normed).max(axis=1, keepdims=True)
+        return np.rint(normed * (127 / np.where(peaks > 0, peaks, 1))).astype(np.int8)
+    return normed.astype(dtype)
+
+def normalized_copy(word_vectors: KeyedVectors, dtype: str = 'float32') -> KeyedVectors:
+    vectors = np.asarray(word_vectors.vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    normed = vectors / np.where(norms > 0, norms, 1)
+
+    store = KeyedVectors(vector_size=word_vectors.vector_size, dtype=np.dtype(dtype))
+    store.add_vectors(word_vectors.index_to_key, quantize_rows(normed, dtype))
+    if dtype == 'float32':
+        # Rows are already unit length, so workers never recompute norms on first most_similar
+        store.norms = np.ones(len(store), dtype=np.float32)
+    else:
+        # The norms of the stored rows are their per-row scales: every reader divides by them to get unit vectors back
+        store.norms = np.linalg.norm(store.vectors.astype(np.float32), axis=1)
+    return store
+
+def quantization_error(word_vectors: KeyedVectors, store: KeyedVectors, pairs: int = ERROR_SAMPLE_PAIRS, seed: int = 0) -> np.ndarray:
+    # Absolute cosine error of the stored vectors against the source vectors, over random word pairs
+    left, right = np.random.default_rng(seed).integers(0, len(store), size=(2, pairs))
+
+    def cosines(vectors):
+        a, b = vectors[left].astype(np.float32), vectors[right].astype(np.float32)
+        norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+        return np.einsum('ij,ij->i', a, b) / np.where(norms > 0, norms, 1)
+
+    return np.abs(cosines(store.vectors) - cosines(word_vectors.vectors))
+
+def convert_vectors(source: str, output_path: str, dtype: str = 'float32') -> str:
+    start = time.perf_counter()
+    source_vectors = load_source_vectors(source)
+    store = normalized_copy(source_vectors, dtype)
+    if dtype != 'float32':
+        errors = quantization_error(source_vectors, store)
+        print(f"{dtype} cosine error over {len(errors)} random pairs: mean {errors.mean():.2e}, p99 {np.percentile(errors, 99):.2e}, max {errors.max():.2e}")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    # Large arrays go to their own .npy files so load(..., mmap='r') can map them
+    store.save(output_path, separately=['vectors', 'norms'])
+    print(f"Wrote {len(store)} normalized {dtype} vectors to {output_path} in {time.perf_counter() - start:.1f}s")
+    return output_path
+
+def load_vectors(path: str) -> KeyedVectors:
+    return KeyedVectors.load(path, mmap='r')
@@ -0,0 +1,46 @@
+from typing import List
+import numpy as np
+from scoring import SearchStats, search_similarities
+
+def random_similarities(rng: np.random.Generator) -> tuple:
+    # Random boards in the shape search_similarities takes, with the ties and repeats that stress pruning bounds
+    team_size = int(rng.integers(1, 10))
+    opponent_count = int(rng.integers(0, 9))
+    sims = rng.uniform(-0.2, 0.9, size=(int(rng.integers(0, 80)), team_size + opponent_count + 1)).astype(np.float32)
+    if rng.random() < 0.5:
+        # Coarse values, so many subsets score exactly the same
+        sims = (np.round(sims * 4) / 4).astype(np.float32)
+    if rng.random() < 0.3 and team_size > 1:
+        # A repeated team word: two identical columns
+        sims[:, 1] = sims[:, 0]
+    if rng.random() < 0.3 and len(sims) > 1:
+        # Hints whose team similarities are another hint's in a different order: equal scores on different combinations
+        sims[1::2, :team_size] = rng.permuted(np.broadcast_to(sims[0, :team_size], (len(sims[1::2]), team_size)), axis=1)
+    if rng.random() < 0.5:
+        # Weak opponents, so more combinations clear the blocking score and compete for the top k
+        sims[:, team_size:] -= 0.5
+    return sims, team_size, opponent_count
+
+def fuzz_search(trials: int = 2000, seed: int = 0) -> List[str]:
+    # pruned must return exactly what exhaustive returns: the same hints, combinations, scores and tie order.
+    # Returns a description of every trial where it does not, or where a search's counts do not add up
+    rng = np.random.default_rng(seed)
+    failures = []
+    for trial in range(trials):
+        sims, team_size, opponent_count = random_similarities(rng)
+        top_k = int(rng.integers(1, 4)) if rng.random() < 0.5 else int(rng.integers(1, 11))
+        max_clue_size = int(rng.integers(2, 7))
+        results, stats = {}, {}
+        for search in ('exhaustive', 'pruned'):
+            stats[search] = SearchStats()
+            results[search] = search_similarities(sims, team_size, opponent_count, top_k=top_k, search=search, stats=stats[search], max_clue_size=max_clue_size)
+        case = f"trial {trial}: {sims.shape[0]} hints, {team_size} team words, {opponent_count} opponents, top_k={top_k}, max_clue_size={max_clue_size}"
+        if results['pruned'] != results['exhaustive']:
+            failures.append(f"{case}: pruned results differ from exhaustive")
+        if stats['pruned'].combinations != stats['exhaustive'].combinations:
+            failures.append(f"{case}: pruned considered {stats['pruned'].combinations} combinations, exhaustive {stats['exhaustive'].combinations}")
+        if stats['pruned'].evaluated + stats['pruned'].pruned != stats['pruned'].combinations:
+            failures.append(f"{case}: pruned evaluated {stats['pruned'].evaluated} and pruned {stats['pruned'].pruned} of {stats['pruned'].combinations} combinations")
+        if stats['exhaustive'].evaluated != stats['exhaustive'].combinations:
+            failures.append(f"{case}: exhaustive evaluated {stats['exhaustive'].evaluated} of {stats['exhaustive'].combinations} combinations")
+    return failures
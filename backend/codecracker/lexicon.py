@@ -0,0 +1,130 @@
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+from nltk import pos_tag_sents
+from nltk.corpus import wordnet
+from gensim.models import KeyedVectors
+from packed import PackedLists, write_packed_lists
+from cache import LRUCache
+
+PROPER_NOUN_TAGS = ('NNP', 'NNPS')
+# Words whose tag is remembered when no proper noun table covers them
+TAGGED_WORDS = 100000
+
+def tag_proper_nouns(words: List[str]) -> List[bool]:
+    # Each word is tagged as its own one-token sentence, exactly like pos_tag([word]), but the tagger loads once
+    return [tagged[0][1] in PROPER_NOUN_TAGS for tagged in pos_tag_sents([[word] for word in words])]
+
+def wordnet_synonyms(word: str) -> List[str]:
+    synonyms = set()
+    for synset in wordnet.synsets(word):
+        for lemma in synset.lemmas():
+            if lemma.name().isalpha():  # Only include valid words
+                synonyms.add(lemma.name())
+    return list(synonyms)
+
+def compile_synonyms(word_vectors: KeyedVectors, path: str, rows: Optional[int] = None) -> str:
+    # Row i holds the synonyms of vocabulary word i as ids into an interned string table
+    start = time.perf_counter()
+    rows = min(rows or len(word_vectors), len(word_vectors))
+    string_ids: Dict[str, int] = {}
+    lists = [[string_ids.setdefault(synonym, len(string_ids)) for synonym in sorted(wordnet_synonyms(word))] for word in word_vectors.index_to_key[:rows]]
+    write_packed_lists(path, None, lists, metadata={'vocab_size': len(word_vectors)}, strings=list(string_ids))
+    print(f"Compiled WordNet synonyms for {rows} words ({len(string_ids)} distinct synonyms) in {time.perf_counter() - start:.1f}s")
+    return path
+
+class SynonymTable:
+    def __init__(self, table: PackedLists, word_vectors: KeyedVectors):
+        if table.metadata['vocab_size'] != len(word_vectors):
+            raise ValueError(f"Synonym table was compiled for {table.metadata['vocab_size']} words, vectors have {len(word_vectors)}")
+        self.table = table
+        self.word_vectors = word_vectors
+
+    @classmethod
+    def load(cls, path: str, word_vectors: KeyedVectors) -> 'SynonymTable':
+        return cls(PackedLists.load(path), word_vectors)
+
+    def covers(self, word: str) -> bool:
+        return self.word_vectors.key_to_index.get(word, len(self.table)) < len(self.table)
+
+    def synonyms(self, word: str) -> List[str]:
+        strings = self.table.strings
+        return [strings[i] for i in self.table.row(self.word_vectors.key_to_index[word])]
+
+def tag_vocabulary(word_vectors: KeyedVectors, batch_size: int = 50000) -> np.ndarray:
+    table = np.zeros(len(word_vectors), dtype=bool)
+    for offset in range(0, len(word_vectors), batch_size):
+        words = word_vectors.index_to_key[offset:offset + batch_size]
+        table[offset:offset + len(words)] = tag_proper_nouns(words)
+    return table
+
+def build_proper_noun_table(word_vectors: KeyedVectors, path: str, batch_size: int = 50000) -> str:
+    start = time.perf_counter()
+    table = tag_vocabulary(word_vectors, batch_size)
+    np.save(path, table)
+    print(f"Tagged {len(table)} words ({int(table.sum())} proper nouns) in {time.perf_counter() - start:.1f}s")
+    return path
+
+def read_word_list(path: str) -> List[str]:
+    # One word per line; blank lines are skipped
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+def vocabulary_mask(word_vectors: KeyedVectors, words: Iterable[str]) -> np.ndarray:
+    mask = np.zeros(len(word_vectors), dtype=bool)
+    mask[[word_vectors.key_to_index[word] for word in words if word in word_vectors.key_to_index]] = True
+    return mask
+
+def eligibility_mask(word_vectors: KeyedVectors, stop_words: Set[str], proper_nouns: np.ndarray) -> np.ndarray:
+    # The words that can ever be a hint: alphabetic, not a stopword and not tagged as a proper noun
+    plain = np.fromiter((word.isalpha() and word.lower() not in stop_words for word in word_vectors.index_to_key), dtype=bool, count=len(word_vectors))
+    return plain & ~np.asarray(proper_nouns, dtype=bool)
+
+class ProperNounFilter:
+    def __init__(self, word_vectors: KeyedVectors, table: Optional[np.ndarray] = None, tagged_limit: int = TAGGED_WORDS):
+        if table is not None and len(table) != len(word_vectors):
+            raise ValueError(f"Proper noun table covers {len(table)} words, vectors have {len(word_vectors)}")
+        self.word_vectors = word_vectors
+        self.table = table
+        self.tagged = LRUCache(tagged_limit)
+
+    @classmethod
+    def load(cls, path: str, word_vectors: KeyedVectors) -> 'ProperNounFilter':
+        return cls(word_vectors, np.load(path, mmap_mode='r'))
+
+    def lookup(self, word: str) -> Optional[bool]:
+        if self.table is not None and word in self.word_vectors.key_to_index:
+            return bool(self.table[self.word_vectors.key_to_index[word]])
+        return self.tagged.get(word)
+
+    def flags(self, words: Iterable[str]) -> List[bool]:
+        words = list(words)
+        flags = [self.lookup(word) for word in words]
+        untagged = list(dict.fromkeys(word for word, flag in zip(words, flags) if flag is None))
+        if untagged:
+            # Read from the fresh tags, since a call with more words than the cache holds evicts some of them
+            tagged = dict(zip(untagged, tag_proper_nouns(untagged)))
+            for word, flag in tagged.items():
+                self.tagged.put(word, flag)
+            flags = [tagged[word] if flag is None else flag for word, flag in zip(words, flags)]
+        return flags
+
+class BoardFilter:
+    # Compiled once per board: a hint conflicts with a board word when either contains the other, case-insensitively.
+    # The forward check is one regex search over the board words, the reverse check one substring search of the board
+    # words joined by newlines, which no vocabulary word contains. An empty board word is contained in every hint, so it rejects them all
+    def __init__(self, board_words: Iterable[str], stop_words: Set[str]):
+        board_words = sorted({word.lower() for word in board_words}, key=len, reverse=True)
+        self.stop_words = stop_words
+        self.pattern = re.compile('|'.join(re.escape(word) for word in board_words))
+        self.joined = '\n'.join(board_words)
+        self.empty = not board_words
+
+    def allows(self, hint: str) -> bool:
+        hint_lower = hint.lower()
+        if hint_lower in self.stop_words:
+            return False
+        if self.empty:
+            return True
+        return hint_lower not in self.joined and self.pattern.search(hint_lower) is None
@@ -0,0 +1,176 @@
+import argparse
+import numpy as np
+from embeddings import convert_vectors, load_vectors, VECTOR_DTYPES
+from assets import prepare_assets
+from neighbors import EligibleVocabulary, build_eligible_vocabulary, build_neighbor_index, TABLE_ROWS, TABLE_TOP_N, IVF_LISTS
+from pool import build_pool_cache, read_word_pool, WORD_POOL_PATH
+from lexicon import ProperNounFilter, build_proper_noun_table, compile_synonyms, eligibility_mask, read_word_list, tag_proper_nouns, tag_vocabulary, vocabulary_mask
+from bulk import solve_file, CHUNK_SIZE
+from benchmark import make_boards, run_benchmark, collect_hints, compare_hints, print_report, compare_reports, read_report, write_report, DEFAULT_TOLERANCE
+from fuzz import fuzz_search
+
+DEFAULT_MODEL = 'glove-twitter-25'
+
+def convert_vectors_command(args):
+    convert_vectors(args.source, args.output, dtype=args.dtype)
+
+def prepare_assets_command(args):
+    prepare_assets(args.root, args.model, source=args.source, neighbor_rows=args.neighbor_rows)
+
+def build_neighbors_command(args):
+    word_vectors = load_vectors(args.vectors)
+    eligible = EligibleVocabulary.load(args.eligible, word_vectors).mask if args.eligible else None
+    build_neighbor_index(word_vectors, args.output, rows=args.rows, top_n=args.top_n, n_lists=args.lists, eligible=eligible)
+
+def build_pos_table_command(args):
+    build_proper_noun_table(load_vectors(args.vectors), args.output)
+
+def build_eligible_command(args):
+    from nltk.corpus import stopwords
+    word_vectors = load_vectors(args.vectors)
+    # A curated dictionary or the most frequent words bound which rows can be hints, and which need tagging
+    allowed = vocabulary_mask(word_vectors, read_word_list(args.words)) if args.words else np.ones(len(word_vectors), dtype=bool)
+    if args.top:
+        allowed[args.top:] = False
+    if args.pos_table:
+        proper_nouns = ProperNounFilter.load(args.pos_table, word_vectors).table
+    elif allowed.all():
+        proper_nouns = tag_vocabulary(word_vectors)
+    else:
+        proper_nouns = np.zeros(len(word_vectors), dtype=bool)
+        proper_nouns[allowed] = tag_proper_nouns([word_vectors.index_to_key[i] for i in np.flatnonzero(allowed)])
+    build_eligible_vocabulary(word_vectors, eligibility_mask(word_vectors, set(stopwords.words('english')), proper_nouns) & allowed, args.output)
+
+def compile_wordnet_command(args):
+    compile_synonyms(load_vectors(args.vectors), args.output, rows=args.rows)
+
+def build_pool_cache_command(args):
+    import app  # Loads the models configured through the CODECRACKER_* environment variables
+    eligible = len(app.eligible_vocabulary) if app.eligible_vocabulary is not None else None
+    build_pool_cache(app.word_vectors, app.compute_word_candidates, args.output, words=read_word_pool(args.pool), top_n=args.top_n, restrict_vocab=app.RESTRICT_VOCAB, eligible=eligible)
+
+def solve_command(args):
+    # Workers load the models configured through the CODECRACKER_* environment variables
+    solve_file(args.input, args.output, workers=args.workers, chunk_size=args.chunk_size, checkpoint_path=args.checkpoint)
+
+def benchmark_command(args):
+    import app  # Loads the models configured through the CODECRACKER_* environment variables
+    boards = make_boards(args.boards, args.seed)
+    report = run_benchmark(app, boards, warmup=args.warmup, allocations=not args.skip_allocations)
+    report.update(seed=args.seed, model=app.CACHE_NAMESPACE)
+    if args.hints_output or args.reference_hints:
+        hints = collect_hints(app, boards)
+        if args.hints_output:
+            write_report({'seed': args.seed, 'boards': len(boards), 'model': app.CACHE_NAMESPACE, 'hints': hints}, args.hints_output)
+        if args.reference_hints:
+            reference = read_report(args.reference_hints)
+            if (reference['seed'], reference['boards']) != (args.seed, len(boards)):
+                raise SystemExit(f"{args.reference_hints} was recorded over different boards")
+            report['accuracy'] = compare_hints(hints, reference['hints'])
+    print_report(report)
+    if args.output:
+        write_report(report, args.output)
+    if args.baseline:
+        baseline = read_report(args.baseline)
+        if (baseline.get('seed'), baseline.get('boards'), baseline.get('model')) != (report['seed'], report['boards'], report['model']):
+            print(f"Warning: {args.baseline} was recorded with different boards or vectors")
+        regressions = compare_reports(report, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            raise SystemExit(1)
+        print(f"No regressions against {args.baseline}")
+
+def fuzz_search_command(args):
+    failures = fuzz_search(args.trials, args.seed)
+    for failure in failures:
+        print(failure)
+    if failures:
+        raise SystemExit(1)
+    print(f"pruned matched exhaustive on all {args.trials} boards")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Codecracker backend maintenance commands")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert = commands.add_parser('convert-vectors', help="Write a unit-normalized, mmap-able copy of a word vector model")
+    convert.add_argument('output', help="Destination .kv path; vectors are stored beside it as .npy files")
+    convert.add_argument('--source', default=DEFAULT_MODEL, help="gensim-data model name or path to a vector file")
+    convert.add_argument('--dtype', choices=VECTOR_DTYPES, default='float32', help="Storage type; float16 halves memory, int8 quarters it with a scale per row")
+    convert.set_defaults(handler=convert_vectors_command)
+
+    prepare = commands.add_parser('prepare-assets', help="Download every corpus and model into a versioned offline bundle")
+    prepare.add_argument('root', help="Directory that holds asset bundles")
+    prepare.add_argument('--model', default=DEFAULT_MODEL, help="Model name recorded in the bundle")
+    prepare.add_argument('--source', help="Vector file to package instead of downloading the model")
+    prepare.add_argument('--neighbor-rows', type=int, default=TABLE_ROWS, help="Words given an exact neighbor table row; 0 skips the neighbor index")
+    prepare.set_defaults(handler=prepare_assets_command)
+
+    neighbors = commands.add_parser('build-neighbors', help="Precompute nearest neighbors so requests never scan the vocabulary")
+    neighbors.add_argument('vectors', help="Vector store written by convert-vectors")
+    neighbors.add_argument('output', help="Directory for the neighbor index")
+    neighbors.add_argument('--rows', type=int, default=TABLE_ROWS, help="Most frequent words given an exact top-N table row")
+    neighbors.add_argument('--top-n', type=int, default=TABLE_TOP_N, help="Neighbors stored per table row")
+    neighbors.add_argument('--lists', type=int, default=IVF_LISTS, help="IVF lists used for words outside the table")
+    neighbors.add_argument('--eligible', help="Mask written by build-eligible; only those words are returned as neighbors")
+    neighbors.set_defaults(handler=build_neighbors_command)
+
+    pos_table = commands.add_parser('build-pos-table', help="Tag the whole vocabulary once and store which words are proper nouns")
+    pos_table.add_argument('vectors', help="Vector store written by convert-vectors")
+    pos_table.add_argument('output', help="Destination .npy path")
+    pos_table.set_defaults(handler=build_pos_table_command)
+
+    eligible = commands.add_parser('build-eligible', help="Store which words can be hints, and their vectors, for restricted neighbor search")
+    eligible.add_argument('vectors', help="Vector store written by convert-vectors")
+    eligible.add_argument('output', help="Directory for the mask, usually beside the vector store")
+    eligible.add_argument('--pos-table', help="Table written by build-pos-table, instead of tagging the vocabulary again")
+    eligible.add_argument('--words', help="Curated clue dictionary, one word per line; no other word can be a hint")
+    eligible.add_argument('--top', type=int, help="Only the N most frequent words can be hints")
+    eligible.set_defaults(handler=build_eligible_command)
+
+    synonyms = commands.add_parser('compile-wordnet', help="Compile WordNet synonyms into a memory-mapped CSR table")
+    synonyms.add_argument('vectors', help="Vector store written by convert-vectors")
+    synonyms.add_argument('output', help="Directory for the synonym table")
+    synonyms.add_argument('--rows', type=int, help="Only compile the most frequent words; the rest fall back to NLTK")
+    synonyms.set_defaults(handler=compile_wordnet_command)
+
+    pool = commands.add_parser('build-pool-cache', help="Precompute filtered hint candidates for every word in the frontend WORD_POOL")
+    pool.add_argument('output', help="Directory for the pool cache")
+    pool.add_argument('--pool', default=WORD_POOL_PATH, help="wordPool.js to read the pool from")
+    pool.add_argument('--top-n', type=int, default=100, help="Neighbors expanded per pool word")
+    pool.set_defaults(handler=build_pool_cache_command)
+
+    solve = commands.add_parser('solve', help="Generate hints for every board in a JSONL or CSV file")
+    solve.add_argument('input', help="Boards as JSONL request bodies, or CSV with ';'-separated word lists")
+    solve.add_argument('output', help="Results as .jsonl, or a .parquet dataset directory (needs pyarrow)")
+    solve.add_argument('--workers', type=int, default=1, help="Worker processes, each mapping the same vector store")
+    solve.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Boards per unit of work and per checkpoint")
+    solve.add_argument('--checkpoint', help="Progress file; defaults to the output path plus .checkpoint")
+    solve.set_defaults(handler=solve_command)
+
+    bench = commands.add_parser('benchmark', help="Time each stage of hint generation over seeded WORD_POOL boards")
+    bench.add_argument('--boards', type=int, default=200, help="Boards to time")
+    bench.add_argument('--seed', type=int, default=0, help="Seed for dealing boards from the word pool")
+    bench.add_argument('--warmup', type=int, default=3, help="Boards run untimed first")
+    bench.add_argument('--skip-allocations', action='store_true', help="Skip the tracemalloc pass")
+    bench.add_argument('--output', help="Write the report as JSON, e.g. to use as a baseline")
+    bench.add_argument('--baseline', help="Report to compare against; exits with status 1 on any regression")
+    bench.add_argument('--hints-output', help="Write every board's hints as JSON, e.g. from a float32 store to compare quantized stores against")
+    bench.add_argument('--reference-hints', help="Hints written by --hints-output; reports how far this run's hints are from them")
+    bench.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown before a stage counts as regressed")
+    bench.set_defaults(handler=benchmark_command)
+
+    fuzz = commands.add_parser('fuzz-search', help="Check pruned search against exhaustive search on random similarity matrices")
+    fuzz.add_argument('--trials', type=int, default=2000, help="Random boards to compare")
+    fuzz.add_argument('--seed', type=int, default=0, help="Seed for the random boards")
+    fuzz.set_defaults(handler=fuzz_search_command)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; spans the sub-millisecond cache paths up to the slowest full scans
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Sample = Tuple[str, Dict[str, str], float]
+
+def format_value(value: float) -> str:
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Sample]:
+        return iter(())
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self.key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = list(self.values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+class Timer:
+    # A plain class rather than a contextmanager generator: spans wrap hot paths
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: 'Histogram', labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> 'Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: a count for each bucket (not cumulative), the sum and the total count
+        self.values: Dict[tuple, List] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self.key(labels)
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][bucket] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels) -> Timer:
+        return Timer(self, labels)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = [(key, list(counts), total, count) for key, (counts, total, count) in self.values.items()]
+        for key, counts, total, count in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", dict(labels, le=format_value(bound)), cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+class CallbackMetric(Metric):
+    # Read at scrape time, for values another object already tracks, such as cache statistics
+    def __init__(self, name: str, documentation: str, kind: str, callback: Callable[[], Dict[tuple, float]], labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self) -> Iterator[Sample]:
+        for key, value in self.callback().items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, kind: str, callback: Callable[[], Dict[tuple, float]], labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, kind, callback, labelnames))
+
+    def render(self) -> str:
+        # Prometheus text exposition format 0.0.4
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,199 @@
+import json
+import os
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+from gensim.models import KeyedVectors
+
+# Vocabularies are frequency ordered, so the first rows cover nearly every word that shows up on a board
+TABLE_ROWS = 50000
+TABLE_TOP_N = 100
+IVF_LISTS = 1024
+IVF_PROBES = 16
+# Quantized rows are widened to float32 this many at a time during a scan, so no scan holds a float32 copy of the matrix
+SCAN_BLOCK = 1024
+METADATA_NAME = 'index.json'
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    k = min(k, scores.shape[-1])
+    if k < scores.shape[-1]:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), scores.shape).copy()
+    candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.argsort(-candidate_scores, axis=-1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=-1), np.take_along_axis(candidate_scores, order, axis=-1)
+
+def cosine_scores(vectors: np.ndarray, norms: np.ndarray, query: np.ndarray) -> np.ndarray:
+    # Every row against a unit query; dividing by the row norms undoes the per-row scale of quantized rows
+    if vectors.dtype == np.float32:
+        scores = vectors @ query
+    else:
+        scores = np.empty(len(vectors), dtype=np.float32)
+        block = np.empty((SCAN_BLOCK, vectors.shape[1]), dtype=np.float32)
+        for start in range(0, len(vectors), SCAN_BLOCK):
+            rows = vectors[start:start + SCAN_BLOCK]
+            block[:len(rows)] = rows
+            scores[start:start + len(rows)] = block[:len(rows)] @ query
+    return scores / np.where(norms > 0, norms, 1)
+
+def scan_most_similar(word_vectors: KeyedVectors, word: str, topn: int = 10, restrict_vocab: Optional[int] = None) -> List[Tuple[str, float]]:
+    # KeyedVectors.most_similar for quantized stores, where gensim would widen the whole matrix on every call.
+    # Like gensim's restrict_vocab, only the first rows are scanned, so an mmap'd store only pages those in
+    word_vectors.fill_norms()
+    index = word_vectors.key_to_index[word]
+    stop = len(word_vectors) if restrict_vocab is None else min(restrict_vocab, len(word_vectors))
+    scores = cosine_scores(word_vectors.vectors[:stop], word_vectors.norms[:stop], normalize_rows(word_vectors.vectors[index]))
+    if index < stop:
+        scores[index] = -np.inf  # A word is never its own neighbor
+    ids, scores = top_k(scores, topn)
+    return [(word_vectors.index_to_key[i], float(score)) for i, score in zip(ids, scores) if i != index]
+
+def build_neighbor_table(normed: np.ndarray, rows: int, top_n: int, batch_size: int = 64, columns: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Neighbors are drawn from the sorted ids in columns, or from every row
+    rows = min(rows, len(normed))
+    targets = normed if columns is None else normed[columns]
+    columns = np.arange(len(normed), dtype=np.int32) if columns is None else columns
+    indices = np.empty((rows, top_n), dtype=np.int32)
+    scores = np.empty((rows, top_n), dtype=np.float32)
+    for start in range(0, rows, batch_size):
+        stop = min(start + batch_size, rows)
+        batch = normed[start:stop] @ targets.T
+        # A word is never its own neighbor
+        positions = np.minimum(np.searchsorted(columns, np.arange(start, stop)), len(columns) - 1)
+        own = np.flatnonzero(columns[positions] == np.arange(start, stop))
+        batch[own, positions[own]] = -np.inf
+        found, scores[start:stop] = top_k(batch, top_n)
+        indices[start:stop] = columns[found]
+    return indices, scores
+
+def nearest_centroids(normed: np.ndarray, centroids: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+    assignment = np.empty(len(normed), dtype=np.int32)
+    for start in range(0, len(normed), batch_size):
+        assignment[start:start + batch_size] = np.argmax(normed[start:start + batch_size] @ centroids.T, axis=1)
+    return assignment
+
+def build_ivf(normed: np.ndarray, n_lists: int, n_iter: int = 8, sample_size: int = 100000, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Spherical k-means on a sample, then every row is filed under its closest centroid
+    rng = np.random.default_rng(seed)
+    n_lists = min(n_lists, len(normed))
+    sample = normed[np.sort(rng.choice(len(normed), size=min(sample_size, len(normed)), replace=False))]
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = nearest_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=n_lists) == 0
+        sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = normalize_rows(sums)
+
+    assignment = nearest_centroids(normed, centroids)
+    members = np.argsort(assignment, kind='stable').astype(np.int32)
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+    return centroids, offsets, members
+
+class NeighborIndex:
+    def __init__(self, word_vectors: KeyedVectors, indices: np.ndarray, scores: np.ndarray, centroids: np.ndarray, offsets: np.ndarray, members: np.ndarray, n_probe: int = IVF_PROBES):
+        self.word_vectors = word_vectors
+        self.indices = indices
+        self.scores = scores
+        self.centroids = centroids
+        self.offsets = offsets
+        self.members = members
+        self.n_probe = n_probe
+
+    @classmethod
+    def load(cls, path: str, word_vectors: KeyedVectors, n_probe: int = IVF_PROBES) -> 'NeighborIndex':
+        with open(os.path.join(path, METADATA_NAME)) as f:
+            metadata = json.load(f)
+        if metadata['vocab_size'] != len(word_vectors):
+            raise ValueError(f"Neighbor index at {path} was built for {metadata['vocab_size']} words, vectors have {len(word_vectors)}")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in ('indices', 'scores', 'centroids', 'offsets', 'members')}
+        return cls(word_vectors, n_probe=n_probe, **arrays)
+
+    def search(self, query: np.ndarray, topn: int, exclude: int = -1) -> Tuple[np.ndarray, np.ndarray]:
+        probes = top_k(self.centroids @ query, self.n_probe)[0]
+        candidates = np.sort(np.concatenate([self.members[self.offsets[i]:self.offsets[i + 1]] for i in probes]))
+        candidates = candidates[candidates != exclude]
+        order, scores = top_k(normalize_rows(self.word_vectors.vectors[candidates]) @ query, topn)
+        return candidates[order], scores
+
+    def most_similar(self, word: str, topn: int = 10) -> List[Tuple[str, float]]:
+        index = self.word_vectors.key_to_index[word]
+        if index < len(self.indices) and topn <= self.indices.shape[1]:
+            ids, scores = self.indices[index, :topn], self.scores[index, :topn]
+        else:
+            query = normalize_rows(self.word_vectors.vectors[index])
+            ids, scores = self.search(query, topn, exclude=index)
+        return [(self.word_vectors.index_to_key[i], float(score)) for i, score in zip(ids, scores)]
+
+def build_neighbor_index(word_vectors: KeyedVectors, path: str, rows: int = TABLE_ROWS, top_n: int = TABLE_TOP_N, n_lists: int = IVF_LISTS, eligible: Optional[np.ndarray] = None) -> str:
+    # With an eligibility mask, every word still gets neighbors but only eligible words are returned as one
+    start = time.perf_counter()
+    normed = normalize_rows(word_vectors.vectors)
+    columns = None if eligible is None else np.flatnonzero(eligible).astype(np.int32)
+    indices, scores = build_neighbor_table(normed, rows, top_n, columns=columns)
+    if columns is None:
+        centroids, offsets, members = build_ivf(normed, n_lists)
+    else:
+        centroids, offsets, members = build_ivf(normed[columns], n_lists)
+        members = columns[members]
+
+    os.makedirs(path, exist_ok=True)
+    for name, array in (('indices', indices), ('scores', scores), ('centroids', centroids), ('offsets', offsets), ('members', members)):
+        np.save(os.path.join(path, f"{name}.npy"), array)
+    with open(os.path.join(path, METADATA_NAME), 'w') as f:
+        json.dump({'vocab_size': len(word_vectors), 'rows': len(indices), 'top_n': top_n, 'lists': len(centroids), 'eligible': None if columns is None else len(columns)}, f, indent=2)
+    print(f"Built neighbor index for {len(indices)} words with {len(centroids)} lists in {time.perf_counter() - start:.1f}s")
+    return path
+
+def build_eligible_vocabulary(word_vectors: KeyedVectors, mask: np.ndarray, path: str) -> str:
+    start = time.perf_counter()
+    mask = np.asarray(mask, dtype=bool)
+    ids = np.flatnonzero(mask)
+    word_vectors.fill_norms()
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'mask.npy'), mask)
+    # Rows keep the store's dtype, so a quantized store stays quantized here too
+    np.save(os.path.join(path, 'vectors.npy'), word_vectors.vectors[ids])
+    np.save(os.path.join(path, 'norms.npy'), np.asarray(word_vectors.norms[ids], dtype=np.float32))
+    with open(os.path.join(path, METADATA_NAME), 'w') as f:
+        json.dump({'vocab_size': len(word_vectors), 'eligible': int(mask.sum())}, f, indent=2)
+    print(f"Stored {int(mask.sum())} of {len(word_vectors)} words as eligible hints in {time.perf_counter() - start:.1f}s")
+    return path
+
+class EligibleVocabulary:
+    # The words that can be hints, with their vectors stored contiguously so a neighbor scan reads only those rows
+    def __init__(self, word_vectors: KeyedVectors, mask: np.ndarray, vectors: np.ndarray, norms: np.ndarray):
+        if len(mask) != len(word_vectors):
+            raise ValueError(f"Eligibility mask covers {len(mask)} words, vectors have {len(word_vectors)}")
+        self.word_vectors = word_vectors
+        self.mask = mask
+        self.ids = np.flatnonzero(mask).astype(np.int32)
+        self.vectors = vectors
+        self.norms = norms
+
+    @classmethod
+    def load(cls, path: str, word_vectors: KeyedVectors) -> 'EligibleVocabulary':
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in ('mask', 'vectors', 'norms')}
+        return cls(word_vectors, **arrays)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def most_similar(self, word: str, topn: int = 10, restrict_vocab: Optional[int] = None) -> List[Tuple[str, float]]:
+        # Rows are in vocabulary order, so the eligible words among the first restrict_vocab are a prefix
+        index = self.word_vectors.key_to_index[word]
+        stop = len(self.ids) if restrict_vocab is None else np.searchsorted(self.ids, restrict_vocab)
+        scores = cosine_scores(self.vectors[:stop], self.norms[:stop], normalize_rows(self.word_vectors.vectors[index]))
+        position = np.searchsorted(self.ids[:stop], index)
+        if position < stop and self.ids[position] == index:
+            scores[position] = -np.inf  # A word is never its own neighbor
+        order, scores = top_k(scores, topn)
+        return [(self.word_vectors.index_to_key[i], float(score)) for i, score in zip(self.ids[order], scores) if i != index]
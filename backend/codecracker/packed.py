@@ -0,0 +1,64 @@
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+METADATA_NAME = 'metadata.json'
+
+def write_packed_lists(path: str, keys: Optional[Sequence[str]], lists: Sequence[Sequence[int]], metadata: Optional[dict] = None, strings: Optional[Sequence[str]] = None) -> str:
+    # CSR layout: the values of row i are values[offsets[i]:offsets[i + 1]]; without keys, rows are addressed by index
+    os.makedirs(path, exist_ok=True)
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(values) for values in lists], out=offsets[1:])
+    values = np.fromiter((value for values in lists for value in values), dtype=np.int32, count=int(offsets[-1]))
+
+    np.save(os.path.join(path, 'offsets.npy'), offsets)
+    np.save(os.path.join(path, 'values.npy'), values)
+    if keys is not None:
+        with open(os.path.join(path, 'keys.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(keys))
+    if strings is not None:
+        with open(os.path.join(path, 'strings.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(strings))
+    with open(os.path.join(path, METADATA_NAME), 'w') as f:
+        json.dump(dict(metadata or {}, rows=len(lists), values=len(values)), f, indent=2)
+    return path
+
+class PackedLists:
+    def __init__(self, keys: Optional[List[str]], offsets: np.ndarray, values: np.ndarray, metadata: dict, strings: Optional[List[str]] = None):
+        self.key_to_index: Dict[str, int] = {key: i for i, key in enumerate(keys or [])}
+        self.offsets = offsets
+        self.values = values
+        self.metadata = metadata
+        self.strings = strings
+
+    @classmethod
+    def load(cls, path: str) -> 'PackedLists':
+        def read_lines(name):
+            with open(os.path.join(path, name), encoding='utf-8') as f:
+                text = f.read()
+            return text.split('\n') if text else []
+
+        with open(os.path.join(path, METADATA_NAME)) as f:
+            metadata = json.load(f)
+        keys = read_lines('keys.txt') if os.path.exists(os.path.join(path, 'keys.txt')) else None
+        strings = read_lines('strings.txt') if os.path.exists(os.path.join(path, 'strings.txt')) else None
+        return cls(
+            keys,
+            np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r'),
+            np.load(os.path.join(path, 'values.npy'), mmap_mode='r'),
+            metadata,
+            strings,
+        )
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_to_index
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def row(self, i: int) -> np.ndarray:
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def get(self, key: str) -> np.ndarray:
+        return self.row(self.key_to_index[key])
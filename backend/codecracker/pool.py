@@ -0,0 +1,46 @@
+import os
+import re
+import time
+from typing import Callable, List, Optional
+import numpy as np
+from gensim.models import KeyedVectors
+from packed import PackedLists, write_packed_lists
+
+WORD_POOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'frontend', 'codecracker', 'src', 'wordPool.js')
+
+def read_word_pool(path: str = WORD_POOL_PATH) -> List[str]:
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    array = source[source.index('['):source.rindex(']')]
+    return list(dict.fromkeys(re.findall(r"'([^']*)'", array)))  # The pool repeats a few words
+
+def build_pool_cache(word_vectors: KeyedVectors, compute_candidates: Callable[[str, int], np.ndarray], path: str, words: Optional[List[str]] = None, top_n: int = 100, restrict_vocab: Optional[int] = None, eligible: Optional[int] = None) -> str:
+    # restrict_vocab and eligible (the eligible word count) record the settings compute_candidates ran under
+    start = time.perf_counter()
+    words = [word for word in (words or read_word_pool()) if word in word_vectors]
+    lists = [compute_candidates(word, top_n) for word in words]
+    write_packed_lists(path, words, lists, metadata={'vocab_size': len(word_vectors), 'top_n': top_n, 'restrict_vocab': restrict_vocab, 'eligible': eligible})
+    print(f"Cached candidates for {len(words)} pool words in {time.perf_counter() - start:.1f}s")
+    return path
+
+class PoolCache:
+    def __init__(self, table: PackedLists, word_vectors: KeyedVectors, restrict_vocab: Optional[int] = None, eligible: Optional[int] = None):
+        if table.metadata['vocab_size'] != len(word_vectors):
+            raise ValueError(f"Pool cache was built for {table.metadata['vocab_size']} words, vectors have {len(word_vectors)}")
+        self.table = table
+        self.word_vectors = word_vectors
+        self.top_n = table.metadata['top_n']
+        self.restrict_vocab = restrict_vocab
+        # Candidates built under another vocabulary limit or eligibility mask are never served
+        self.matches = (table.metadata.get('restrict_vocab'), table.metadata.get('eligible')) == (restrict_vocab, eligible)
+
+    @classmethod
+    def load(cls, path: str, word_vectors: KeyedVectors, restrict_vocab: Optional[int] = None, eligible: Optional[int] = None) -> 'PoolCache':
+        return cls(PackedLists.load(path), word_vectors, restrict_vocab, eligible)
+
+    def covers(self, word: str, top_n: int) -> bool:
+        return self.matches and top_n == self.top_n and word in self.table
+
+    def candidate_ids(self, word: str) -> np.ndarray:
+        ids = self.table.get(word)
+        return ids[ids < self.restrict_vocab] if self.restrict_vocab else ids
@@ -0,0 +1,51 @@
+import hmac
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Iterable, Optional
+
+DEFAULT_INTERVAL = 0.002
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def is_authorized(key: Optional[str], allowed_keys: Iterable[str]) -> bool:
+    # Compared in constant time, as bytes since compare_digest rejects non-ASCII str; with no keys configured nothing is authorized
+    return bool(key) and any(hmac.compare_digest(key.encode('utf-8'), allowed.encode('utf-8')) for allowed in allowed_keys)
+
+class SamplingProfiler:
+    # Samples one thread's Python stack from a background thread, so the profiled code runs unmodified.
+    # Output is collapsed stacks ("outer;inner count" per line), the input of flamegraph.pl and speedscope
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name='codecracker-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        return '\n'.join(f"{stack} {count}" for stack, count in sorted(self.stacks.items())) + '\n'
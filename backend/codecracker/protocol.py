@@ -0,0 +1,62 @@
+from math import comb
+from typing import Dict, List, Optional, Tuple
+from scoring import SearchStats, DEFAULT_TOP_K, MAX_TOP_K, SEARCH_STRATEGIES, DEFAULT_MAX_CLUE_SIZE, MAX_CLUE_SIZE, MAX_TEAM_WORDS, MAX_EXHAUSTIVE_COMBINATIONS, MAX_PRUNED_COMBINATIONS
+
+# Origins the frontend is served from
+ALLOWED_ORIGINS = ["http://localhost:3000", "https://codecracker-seven.vercel.app"]
+# Longest word and most words across all four board fields a request may send; a Codenames board has 25
+MAX_WORD_LENGTH = 50
+MAX_BOARD_WORDS = 100
+
+def parse_hint_request(data: dict) -> Tuple[Optional[dict], Optional[str]]:
+    # Returns the scoring parameters, or an error message for a 400
+    params = {
+        'my_words': data.get('my_words', []),
+        'opponent_words': data.get('opponent_words', []),
+        'neutral_words': data.get('neutral_words', []),
+        'assassin_word': data.get('assassin_word', ''),
+        'top_k': data.get('top_k', DEFAULT_TOP_K),
+        'max_clue_size': data.get('max_clue_size', DEFAULT_MAX_CLUE_SIZE),
+        'search': data.get('search'),
+        'include_stats': bool(data.get('include_stats')),
+    }
+
+    if not params['my_words']:
+        return None, "No words provided"
+    if len(params['my_words']) > MAX_TEAM_WORDS:
+        return None, f"At most {MAX_TEAM_WORDS} team words"
+    board_lists = [params['my_words'], params['opponent_words'], params['neutral_words']]
+    if not all(isinstance(words, list) for words in board_lists):
+        return None, "my_words, opponent_words and neutral_words must be lists of words"
+    board_words = [word for words in board_lists for word in words] + [params['assassin_word']]
+    if len(board_words) > MAX_BOARD_WORDS:
+        return None, f"At most {MAX_BOARD_WORDS} board words"
+    if not all(isinstance(word, str) and len(word) <= MAX_WORD_LENGTH for word in board_words):
+        return None, f"Board words must be strings of at most {MAX_WORD_LENGTH} characters"
+    if type(params['top_k']) is not int or not 1 <= params['top_k'] <= MAX_TOP_K:
+        return None, f"top_k must be an integer between 1 and {MAX_TOP_K}"
+    if type(params['max_clue_size']) is not int or not 2 <= params['max_clue_size'] <= MAX_CLUE_SIZE:
+        return None, f"max_clue_size must be an integer between 2 and {MAX_CLUE_SIZE}"
+    if params['search'] is None:
+        # Past the default clue sizes the number of word combinations explodes, so only prefix subsets are scored
+        params['search'] = 'prefix' if params['max_clue_size'] > DEFAULT_MAX_CLUE_SIZE else 'pruned'
+    if params['search'] not in SEARCH_STRATEGIES:
+        return None, f"search must be one of {', '.join(SEARCH_STRATEGIES)}"
+
+    # Word order and repeats do not change which hints exist, so the board is deduplicated and sorted and equal boards share one response.
+    # A repeated team word would also tie every subset that swaps one copy for another, which pruned search cannot cut
+    for words in ('my_words', 'opponent_words', 'neutral_words'):
+        params[words] = sorted(set(params[words]))
+
+    largest = max(comb(len(params['my_words']), size) for size in range(2, params['max_clue_size'] + 1))
+    if params['search'] == 'exhaustive' and largest > MAX_EXHAUSTIVE_COMBINATIONS:
+        return None, f"exhaustive search is limited to {MAX_EXHAUSTIVE_COMBINATIONS} word combinations per clue size; use pruned or prefix"
+    if params['search'] == 'pruned' and largest > MAX_PRUNED_COMBINATIONS:
+        return None, f"pruned search is limited to {MAX_PRUNED_COMBINATIONS} word combinations per clue size; use prefix"
+    return params, None
+
+def hints_body(hints: Dict[int, List[Tuple[str, float, List[str]]]], stats: Optional[SearchStats]) -> dict:
+    body = {str(num_words): clues for num_words, clues in hints.items()}  # JSON keys are strings either way
+    if stats is not None:
+        body['stats'] = stats.to_dict()
+    return body
@@ -0,0 +1,230 @@
+from typing import Any, List, Optional, Tuple, Dict, Sequence
+from dataclasses import dataclass, asdict
+from itertools import combinations
+from math import comb
+import heapq
+import numpy as np
+
+DEFAULT_MAX_CLUE_SIZE = 4
+MAX_CLUE_SIZE = 25
+DEFAULT_TOP_K = 5
+MAX_TOP_K = 50
+HINT_CHUNK = 4096
+SEARCH_STRATEGIES = ('pruned', 'exhaustive', 'prefix')
+# A Codenames board has 25 cards
+MAX_TEAM_WORDS = 25
+# exhaustive materializes every combination of one clue size and scores it against a chunk of hints at once
+MAX_EXHAUSTIVE_COMBINATIONS = 1000
+# pruned prunes nothing when a hint's team similarities tie, so it is held to the default clue sizes' worst case
+MAX_PRUNED_COMBINATIONS = comb(MAX_TEAM_WORDS, DEFAULT_MAX_CLUE_SIZE)
+# Lower bound on adaptive_threshold, which would otherwise reach zero for 8-word clues
+MIN_THRESHOLD = 0.05
+# Bounds are summed in a different order than the final scores, so they get a little slack before pruning
+BOUND_SLACK = 1e-9
+
+@dataclass
+class SearchStats:
+    combinations: int = 0
+    evaluated: int = 0
+    pruned: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def adaptive_threshold(num_words: int) -> float:
+    base_threshold = 0.4
+    return max(base_threshold - (num_words * 0.05), MIN_THRESHOLD)
+
+def clue_sizes(max_clue_size: int = DEFAULT_MAX_CLUE_SIZE) -> range:
+    return range(max_clue_size, 1, -1)
+
+class TopK:
+    # Bounded min-heap; lower ranks (push order by default) win ties, matching a stable sort of everything pushed
+    def __init__(self, k: int):
+        self.k = k
+        self.heap = []
+        self.pushed = 0
+
+    def push(self, score: float, item: Any, rank: Optional[int] = None) -> bool:
+        entry = (score, -(self.pushed if rank is None else rank), item)
+        self.pushed += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+            return True
+        if self.k and entry[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, entry)
+            return True
+        return False
+
+    def floor(self) -> float:
+        # Anything scoring at or below this cannot enter a full heap
+        return self.heap[0][0] if self.k and len(self.heap) == self.k else float('-inf')
+
+    def items(self) -> List[Tuple[float, Any]]:
+        return [(score, item) for score, _, item in sorted(self.heap, key=lambda entry: entry[:2], reverse=True)]
+
+def select_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # argpartition-style selection with the same order and tie-breaking as a stable descending sort
+    if k <= 0 or not len(scores):
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))[:k]]
+
+def combination_rank(combo: Sequence[int], n: int) -> int:
+    # Position of a sorted combination in combinations(range(n), len(combo)) order
+    rank, previous, k = 0, -1, len(combo)
+    for i, c in enumerate(combo):
+        for skipped in range(previous + 1, c):
+            rank += comb(n - 1 - skipped, k - 1 - i)
+        previous = c
+    return rank
+
+def vocab_ids(word_vectors, words: Sequence[str]) -> np.ndarray:
+    # Resolves words to int32 vocabulary ids once; -1 marks a word outside the vocabulary
+    key_to_index = word_vectors.key_to_index
+    return np.fromiter((key_to_index.get(word, -1) for word in words), dtype=np.int32, count=len(words))
+
+def unit_rows(word_vectors, ids: np.ndarray) -> np.ndarray:
+    # Rows for ids of -1 stay zero, so words outside the vocabulary score 0.0 against everything
+    word_vectors.fill_norms()
+    rows = np.zeros((len(ids), word_vectors.vector_size), dtype=np.float32)
+    known = np.flatnonzero(ids >= 0)
+    if len(known):
+        norms = word_vectors.norms[ids[known]]
+        rows[known] = word_vectors.vectors[ids[known]] / np.where(norms > 0, norms, 1)[:, np.newaxis]
+    return rows
+
+def id_similarity_matrix(word_vectors, hint_ids: np.ndarray, board_ids: np.ndarray) -> np.ndarray:
+    return unit_rows(word_vectors, hint_ids) @ unit_rows(word_vectors, board_ids).T
+
+def combination_coherence(team_sims: np.ndarray, combos: np.ndarray, weight_factor: float = 0.7, per_row: bool = False) -> np.ndarray:
+    # Summed column by column in combination order, in float64, so equal inputs always give the same scores.
+    # combos is shared by every hint, or with per_row holds one combination per hint
+    def column(j):
+        return np.take_along_axis(team_sims, combos[:, j:j + 1], axis=1)[:, 0] if per_row else team_sims[:, combos[:, j]]
+
+    total = column(0).astype(np.float64)
+    for j in range(1, combos.shape[1]):
+        total = total + column(j)
+    return total / (combos.shape[1] ** weight_factor)
+
+def exhaustive_search(team_sims: np.ndarray, blocking_score: np.ndarray, num_words: int, top: TopK, stats: SearchStats) -> None:
+    hint_count = len(team_sims)
+    combos = np.array(list(combinations(range(team_sims.shape[1]), num_words)), dtype=np.intp).reshape(-1, num_words)
+    stats.evaluated += len(combos) * hint_count
+    # Hints are scored in fixed-size chunks so memory stays flat however many candidates pass
+    for start in range(0, hint_count if len(combos) else 0, HINT_CHUNK):
+        stop = min(start + HINT_CHUNK, hint_count)
+        coherence = combination_coherence(team_sims[start:stop], combos).T
+        passing = (coherence > adaptive_threshold(num_words)) & (coherence > blocking_score[np.newaxis, start:stop])
+
+        flat_index = np.flatnonzero(passing)
+        for position in flat_index[select_top_k(coherence.ravel()[flat_index], top.k)]:
+            combo_index, offset = divmod(int(position), stop - start)
+            # Rank by position in the original combination-major loop so ties resolve exactly as before
+            top.push(float(coherence[combo_index, offset]), (start + offset, tuple(combos[combo_index])), rank=combo_index * hint_count + start + offset)
+
+def rank_team_words(team_sims: np.ndarray) -> np.ndarray:
+    # Each hint's team words, most similar first
+    return np.argsort(-team_sims, axis=1, kind='stable')
+
+def prefix_search(team_sims: np.ndarray, order: np.ndarray, blocking_score: np.ndarray, num_words: int, top: TopK, stats: SearchStats) -> None:
+    # Only the k most similar team words are tried per hint: one subset each, the best one for that hint
+    hint_count, team_size = team_sims.shape
+    if num_words > team_size or not hint_count:
+        return
+    combos = np.sort(order[:, :num_words], axis=1)
+    coherence = combination_coherence(team_sims, combos, per_row=True)
+    stats.evaluated += hint_count
+    stats.pruned += hint_count * (comb(team_size, num_words) - 1)
+
+    passing = np.flatnonzero((coherence > adaptive_threshold(num_words)) & (coherence > blocking_score))
+    for hint_index in passing[select_top_k(coherence[passing], top.k)]:
+        top.push(float(coherence[hint_index]), (int(hint_index), tuple(combos[hint_index].tolist())), rank=int(hint_index))
+
+def pruned_search(team_sims: np.ndarray, order: np.ndarray, blocking_score: np.ndarray, num_words: int, top: TopK, stats: SearchStats, weight_factor: float = 0.7) -> None:
+    hint_count, team_size = team_sims.shape
+    if num_words > team_size:
+        return
+    scale = num_words ** weight_factor
+    threshold = adaptive_threshold(num_words)
+    subsets = comb(team_size, num_words)
+
+    # With each hint's team similarities sorted, the best k-subset is the first k and every bound is a prefix sum
+    ranked = np.take_along_axis(team_sims, order, axis=1).astype(np.float64)
+    prefix = np.zeros((hint_count, team_size + 1))
+    np.cumsum(ranked, axis=1, out=prefix[:, 1:])
+    best = prefix[:, num_words] / scale
+    floors = np.maximum(blocking_score.astype(np.float64), threshold)
+
+    alive = np.flatnonzero(best + BOUND_SLACK > floors)
+    stats.pruned += (hint_count - len(alive)) * subsets
+    alive = alive[np.argsort(-best[alive], kind='stable')]
+
+    for visited, hint_index in enumerate(alive):
+        if best[hint_index] + BOUND_SLACK < top.floor():
+            # Hints are visited best-first, so none of the remaining ones can reach the heap either
+            stats.pruned += (len(alive) - visited) * subsets
+            break
+
+        sims = team_sims[hint_index].tolist()
+        ranked_sims = ranked[hint_index].tolist()
+        sims_prefix = prefix[hint_index].tolist()
+        positions = order[hint_index].tolist()
+        floor = float(floors[hint_index])
+        blocking = float(blocking_score[hint_index])
+        chosen = []
+
+        def extend(start: int, partial: float):
+            need = num_words - len(chosen)
+            if not need:
+                combo = sorted(positions[p] for p in chosen)
+                coherence = 0
+                for i in combo:
+                    coherence += sims[i]
+                coherence /= scale
+                stats.evaluated += 1
+                if coherence > threshold and coherence > blocking:
+                    top.push(coherence, (hint_index, tuple(combo)), rank=combination_rank(combo, team_size) * hint_count + hint_index)
+                return
+            for p in range(start, team_size - need + 1):
+                bound = (partial + sims_prefix[p + need] - sims_prefix[p]) / scale
+                if bound + BOUND_SLACK <= floor or bound + BOUND_SLACK < top.floor():
+                    # Later positions only hold smaller similarities, so every subset from here on is out
+                    stats.pruned += comb(team_size - p, need)
+                    return
+                chosen.append(p)
+                extend(p + 1, partial + ranked_sims[p])
+                chosen.pop()
+
+        extend(0, 0.0)
+
+def search_similarities(sims: np.ndarray, team_size: int, opponent_count: int, top_k: int = DEFAULT_TOP_K, search: str = 'pruned', stats: Optional[SearchStats] = None, max_clue_size: int = DEFAULT_MAX_CLUE_SIZE) -> Dict[int, List[Tuple[int, float, Tuple[int, ...]]]]:
+    # sims holds one row per hint and one column per board word: team words, then opponents, then the assassin.
+    # Results are (hint row, score, team word columns), so callers decide when to turn them back into strings
+    stats = stats if stats is not None else SearchStats()
+    team_sims = sims[:, :team_size]
+    if opponent_count:
+        opponent_score = sims[:, team_size:-1].max(axis=1)
+    else:
+        opponent_score = np.zeros(len(sims), dtype=np.float32)
+    blocking_score = np.maximum(opponent_score, sims[:, -1])
+    order = rank_team_words(team_sims) if search != 'exhaustive' else None
+
+    results = {num_words: [] for num_words in sorted(clue_sizes(max_clue_size))}
+    for num_words in clue_sizes(max_clue_size):
+        stats.combinations += comb(team_size, num_words) * len(sims)
+        top = TopK(top_k)
+        if search == 'exhaustive':
+            exhaustive_search(team_sims, blocking_score, num_words, top, stats)
+        elif search == 'prefix':
+            prefix_search(team_sims, order, blocking_score, num_words, top, stats)
+        else:
+            pruned_search(team_sims, order, blocking_score, num_words, top, stats)
+        results[num_words] = [(hint_index, score, combo) for score, (hint_index, combo) in top.items()]
+
+    return results
@@ -0,0 +1,73 @@
+import threading
+from typing import Dict, List, Sequence
+import numpy as np
+from gensim.models import KeyedVectors
+from scoring import unit_rows
+
+class GameSession:
+    # Everything about a game that survives a revealed card: team-word candidates, hint vectors and
+    # one similarity column per board word id over every hint the game has seen
+    def __init__(self, word_vectors: KeyedVectors):
+        self.word_vectors = word_vectors
+        self.candidates: Dict[str, np.ndarray] = {}
+        self.hint_ids = np.zeros(0, dtype=np.int32)
+        self.hint_index: Dict[int, int] = {}
+        self.hint_rows = np.zeros((0, word_vectors.vector_size), dtype=np.float32)
+        self.columns: Dict[int, np.ndarray] = {}
+        self.turns = 0
+        self.columns_computed = 0
+        self.lock = threading.Lock()
+
+    def missing_candidates(self, team_words: Sequence[str]) -> List[str]:
+        return [word for word in team_words if word in self.word_vectors and word not in self.candidates]
+
+    def add_candidates(self, candidates: Dict[str, np.ndarray]) -> None:
+        self.candidates.update(candidates)
+        new_ids = [hint_id for ids in candidates.values() for hint_id in ids.tolist() if hint_id not in self.hint_index]
+        new_ids = np.array(list(dict.fromkeys(new_ids)), dtype=np.int32)
+        if not len(new_ids):
+            return
+        self.hint_index.update((hint_id, len(self.hint_ids) + i) for i, hint_id in enumerate(new_ids.tolist()))
+        self.hint_ids = np.concatenate([self.hint_ids, new_ids])
+        new_rows = unit_rows(self.word_vectors, new_ids)
+        self.hint_rows = np.concatenate([self.hint_rows, new_rows])
+        # Columns already on the board only need entries for the new hints
+        for word_id, column in self.columns.items():
+            self.columns[word_id] = np.concatenate([column, new_rows @ self.word_row(word_id)])
+
+    def word_row(self, word_id: int) -> np.ndarray:
+        return unit_rows(self.word_vectors, np.array([word_id], dtype=np.int32))[0]
+
+    def candidate_hints(self, team_words: Sequence[str]) -> np.ndarray:
+        # Ordered by when the game first saw each hint, so rescoring an unchanged board is stable
+        rows = {self.hint_index[hint_id] for word in team_words if word in self.candidates for hint_id in self.candidates[word].tolist()}
+        return self.hint_ids[sorted(rows)]
+
+    def update_board(self, board_words: Sequence[str], board_ids: np.ndarray) -> None:
+        # Revealed cards drop their columns; only words new to the board are computed
+        board_ids, board_words = set(board_ids.tolist()), set(board_words)
+        self.columns = {word_id: column for word_id, column in self.columns.items() if word_id in board_ids}
+        self.candidates = {word: ids for word, ids in self.candidates.items() if word in board_words}
+        self.compact()
+        for word_id in board_ids - self.columns.keys():
+            self.columns[word_id] = self.hint_rows @ self.word_row(word_id)
+            self.columns_computed += 1
+        self.turns += 1
+
+    def compact(self) -> None:
+        # Drops hint rows no remaining candidate list refers to, so a game id reused for many boards stays the size of one
+        referenced = {hint_id for ids in self.candidates.values() for hint_id in ids.tolist()}
+        if len(referenced) == len(self.hint_ids):
+            return
+        keep = np.fromiter((hint_id in referenced for hint_id in self.hint_ids.tolist()), dtype=bool, count=len(self.hint_ids))
+        self.hint_ids = self.hint_ids[keep]
+        self.hint_rows = self.hint_rows[keep]
+        self.hint_index = {hint_id: row for row, hint_id in enumerate(self.hint_ids.tolist())}
+        self.columns = {word_id: column[keep] for word_id, column in self.columns.items()}
+
+    def similarities(self, hint_ids: np.ndarray, board_ids: np.ndarray) -> np.ndarray:
+        rows = np.fromiter((self.hint_index[hint_id] for hint_id in hint_ids.tolist()), dtype=np.intp, count=len(hint_ids))
+        sims = np.empty((len(hint_ids), len(board_ids)), dtype=np.float32)
+        for j, word_id in enumerate(board_ids.tolist()):
+            sims[:, j] = self.columns[word_id][rows]
+        return sims